@@ -1,7 +1,13 @@
-from .aqueduct_client import create_client
+from .aqueduct_client import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    create_client,
+)
 from ._version import get_versions
 
 __all__ = [
+    'ALL_COMPLETED',
+    'FIRST_COMPLETED',
     'create_client',
 ]
 
@@ -0,0 +1,382 @@
+"""
+An asyncio flavour of AqueductClient, built on aiohttp.
+
+Requires Python 3.5+ and aiohttp (``pip install aqueduct-client[aio]``).
+"""
+import asyncio
+from functools import partial
+import os
+import tempfile
+
+import aiohttp
+
+from .aqueduct_client import (
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_TIMEOUT,
+    RESULTS_CHUNK_SIZE,
+    _check_finished_successfully,
+    _check_result_format,
+    _make_submission_args,
+)
+from .cache import (
+    DEFAULT_IN_PROGRESS_TTL,
+    DEFAULT_METADATA_CACHE_SIZE,
+    ExecutionMetadataCache,
+)
+from .errors import (
+    ConcurrentExecutionsExceeded,
+    PipelineExecutionTimeout,
+    ResultsDownloadError,
+)
+from .utils import (
+    FINISHED_STATUSES,
+    backoff_intervals,
+    load_api_key,
+    monotonic,
+)
+
+
+def create_async_client(
+    api_key=None,
+    base_url="https://factset.quantopian.com/api/experimental/pipelines",
+    executor=None,
+    metadata_cache_size=DEFAULT_METADATA_CACHE_SIZE,
+    in_progress_ttl=DEFAULT_IN_PROGRESS_TTL,
+    timeout=DEFAULT_TIMEOUT,
+):
+    """
+    Create an AsyncAqueductClient.
+
+    Parameters
+    ----------
+    api_key : str, optional
+        The Quantopian API key to use.  If not given, we attempt to load
+        the key as `create_client` does.
+
+    base_url : str, optional
+        The base URL for the Aqueduct API.  Defaults to the
+        FactSet Aqueduct endpoint.
+
+    executor : concurrent.futures.Executor, optional
+        The executor in which results are parsed.  If not given, the event
+        loop's default executor is used.
+
+    metadata_cache_size : int, optional
+        The number of pipeline executions whose metadata is cached in
+        memory.  Pass 0 to always fetch metadata from the API.
+
+    in_progress_ttl : float, optional
+        The number of seconds for which the cached metadata of a running
+        pipeline execution is used before it is fetched again.
+
+    timeout : float or (float, float), optional
+        The connect and read timeouts, in seconds, of every HTTP request.
+        Pass None to wait indefinitely.
+    """
+    if api_key is None:
+        api_key = load_api_key()
+
+    return AsyncAqueductClient(
+        api_key=api_key,
+        base_url=base_url,
+        executor=executor,
+        metadata_cache_size=metadata_cache_size,
+        in_progress_ttl=in_progress_ttl,
+        timeout=timeout,
+    )
+
+
+class AsyncAqueductClient(object):
+    """
+    AsyncAqueductClient provides the same methods as AqueductClient as
+    coroutines, so that many requests can be in flight at once from a
+    single event loop.
+
+    The client should be closed when it is no longer needed, either with
+    `close` or by using it as an async context manager.
+    """
+    def __init__(self,
+                 api_key,
+                 base_url,
+                 executor=None,
+                 metadata_cache_size=DEFAULT_METADATA_CACHE_SIZE,
+                 in_progress_ttl=DEFAULT_IN_PROGRESS_TTL,
+                 timeout=DEFAULT_TIMEOUT):
+        self._base_url = base_url
+        self._api_key = api_key
+        self._executor = executor
+
+        # aiohttp sessions must be created from within a running event
+        # loop, so we create ours on first use.  Results are downloaded
+        # through a separate session, so that our API key is never sent
+        # to the storage host behind the signed results url.
+        self._session = None
+        self._download_session = None
+        self._timeout = _client_timeout(timeout)
+
+        self._metadata_cache = ExecutionMetadataCache(
+            metadata_cache_size,
+            in_progress_ttl,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the client's HTTP connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+        if self._download_session is not None:
+            await self._download_session.close()
+            self._download_session = None
+
+    async def get_all_pipeline_executions(self):
+        """
+        Returns the metadata of all the pipeline executions you've run.
+
+        See `AqueductClient.get_all_pipeline_executions`.
+        """
+        async with self._get('') as response:
+            response.raise_for_status()
+            pipelines = (await response.json(content_type=None))['pipelines']
+
+        for pipeline in pipelines:
+            self._metadata_cache.put(pipeline)
+
+        return pipelines
+
+    async def get_pipeline_execution(self, execution_id):
+        """
+        Returns the metadata of a single pipeline execution.
+
+        See `AqueductClient.get_pipeline_execution`.
+        """
+        pipeline = self._metadata_cache.get(execution_id)
+        if pipeline is not None:
+            return pipeline
+
+        return await self._fetch_pipeline_execution(execution_id)
+
+    async def get_pipeline_execution_quota(self):
+        """
+        Returns the number of currently active (queued or running)
+        pipeline executions, and what the quota is.
+
+        See `AqueductClient.get_pipeline_execution_quota`.
+        """
+        async with self._get('/concurrent_executions_info') as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def submit_pipeline_execution(self,
+                                        code,
+                                        start_date,
+                                        end_date,
+                                        name=None,
+                                        params=None,
+                                        asset_identifier_format="sid",
+                                        result_format=None):
+        """
+        Creates and queues a new pipeline execution.
+
+        See `AqueductClient.submit_pipeline_execution`.
+        """
+        args = _make_submission_args(
+            code,
+            start_date,
+            end_date,
+            name,
+            params,
+            asset_identifier_format,
+            result_format,
+        )
+
+        async with self._post('', args) as response:
+            if response.status == 429:
+                # concurrent execution quota exceeded
+                data = await response.json(content_type=None)
+                raise ConcurrentExecutionsExceeded(
+                    data["current"],
+                    data["allowed"],
+                )
+            else:
+                response.raise_for_status()
+
+            return (await response.json(content_type=None))['pipeline_id']
+
+    async def wait_for_execution(self,
+                                 execution_id,
+                                 timeout=None,
+                                 poll_interval=DEFAULT_POLL_INTERVAL,
+                                 max_interval=DEFAULT_MAX_POLL_INTERVAL,
+                                 fetch_results=False):
+        """
+        Waits until a pipeline execution has finished.
+
+        See `AqueductClient.wait_for_execution`.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        intervals = backoff_intervals(poll_interval, max_interval)
+
+        pipeline = await self.get_pipeline_execution(execution_id)
+        while pipeline["status"] not in FINISHED_STATUSES:
+            delay = next(intervals)
+
+            if deadline is not None:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise PipelineExecutionTimeout([execution_id], timeout)
+                delay = min(delay, remaining)
+
+            await asyncio.sleep(delay)
+            pipeline = await self._fetch_pipeline_execution(execution_id)
+
+        if fetch_results:
+            return await self.get_pipeline_results_dataframe(execution_id)
+
+        return pipeline
+
+    async def get_pipeline_results_dataframe(self,
+                                             execution_id,
+                                             result_format=None):
+        """
+        Gets the result of this pipeline in a pandas dataframe.
+
+        The results are streamed to a temporary file, and parsed in the
+        client's executor so that the event loop is not blocked.
+
+        See `AqueductClient.get_pipeline_results_dataframe`.
+        """
+        from .results import read_results_file, resolve_result_format
+
+        if result_format is not None:
+            _check_result_format(result_format)
+            result_format = resolve_result_format(result_format)
+
+        pipeline_status = await self.get_pipeline_execution(execution_id)
+        _check_finished_successfully(pipeline_status, execution_id)
+
+        asset_identifier_format = pipeline_status["asset_identifier_format"]
+
+        if result_format is not None and result_format != "csv":
+            params = {"format": result_format}
+        else:
+            params = None
+
+        async with self._get(
+            '/{execution_id}/results_url'.format(execution_id=execution_id),
+            params=params,
+        ) as response:
+            response.raise_for_status()
+            url = (await response.json(content_type=None))['url']
+
+        loop = asyncio.get_event_loop()
+        fd, results_path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'wb') as results_file:
+                async with self._get_download_session().get(url) as \
+                        results_url_resp:
+                    if results_url_resp.status != 200:
+                        raise ResultsDownloadError(
+                            execution_id,
+                            "HTTP {status}".format(
+                                status=results_url_resp.status,
+                            ),
+                        )
+
+                    async for chunk in results_url_resp.content.iter_chunked(
+                        RESULTS_CHUNK_SIZE,
+                    ):
+                        results_file.write(chunk)
+
+            # the server may not be able to provide the format we asked
+            # for, so the format is detected from the file itself.
+            return await loop.run_in_executor(
+                self._executor,
+                partial(
+                    read_results_file,
+                    results_path,
+                    asset_identifier_format,
+                ),
+            )
+        finally:
+            os.remove(results_path)
+
+    async def get_pipeline_execution_error(self, execution_id):
+        """
+        Gets the error that caused this pipeline to fail to complete
+        successfully.
+
+        See `AqueductClient.get_pipeline_execution_error`.
+        """
+        pipeline_status = await self.get_pipeline_execution(execution_id)
+        if pipeline_status["status"] != "FAILED":
+            raise ValueError(
+                "Pipeline execution {execution_id} did not end in "
+                "error!".format(execution_id=execution_id)
+            )
+
+        async with self._get(
+            '/{execution_id}/exception'.format(execution_id=execution_id),
+        ) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def _fetch_pipeline_execution(self, execution_id):
+        async with self._get(
+            '/{execution_id}'.format(execution_id=execution_id),
+        ) as response:
+            response.raise_for_status()
+            pipeline = (await response.json(content_type=None))['pipeline']
+
+        self._metadata_cache.put(pipeline)
+
+        return pipeline
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                headers={'Quantopian-API-Key': self._api_key},
+                timeout=self._timeout,
+            )
+        return self._session
+
+    def _get_download_session(self):
+        if self._download_session is None:
+            self._download_session = aiohttp.ClientSession(
+                timeout=self._timeout,
+            )
+        return self._download_session
+
+    def _get(self, path, params=None):
+        return self._get_session().get(self._base_url + path, params=params)
+
+    def _post(self, path, body):
+        return self._get_session().post(self._base_url + path, json=body)
+
+
+def _client_timeout(timeout):
+    """
+    Converts a requests-style timeout into an aiohttp one.
+    """
+    if timeout is None:
+        return aiohttp.ClientTimeout(total=None)
+
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+    else:
+        connect = read = timeout
+
+    return aiohttp.ClientTimeout(
+        total=None,
+        sock_connect=connect,
+        sock_read=read,
+    )
@@ -1,24 +1,106 @@
-try:
-    from cStringIO import StringIO
-except ImportError:
-    from io import StringIO
-
+from collections import OrderedDict
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from contextlib import closing, contextmanager
+from functools import partial
+import io
 import json
+import logging
+import os
+import tempfile
+import threading
+import time
 
-import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
 
+from .cache import (
+    DEFAULT_CACHE_MAX_SIZE,
+    DEFAULT_IN_PROGRESS_TTL,
+    DEFAULT_METADATA_CACHE_SIZE,
+    ExecutionMetadataCache,
+    ResultsCache,
+    SchemaCache,
+)
 from .utils import (
+    ASSET_IDENTIFIER_FORMATS,
+    FINISHED_STATUSES,
+    RESULT_FORMATS,
+    backoff_intervals,
     load_api_key,
+    monotonic,
     normalize_date_input,
+    split_date_range,
+)
+
+from .errors import (
+    ConcurrentExecutionsExceeded,
+    DeadlineExceeded,
+    PipelineExecutionTimeout,
+    ResultsDownloadError,
+)
+from .instrumentation import ClientStats
+from .retry import RetryPolicy
+
+log = logging.getLogger(__name__)
+
+# Size of the chunks in which pipeline results are streamed to disk.
+RESULTS_CHUNK_SIZE = 1024 * 1024
+
+# Number of csv rows read at a time when iterating over pipeline results.
+RESULTS_ITER_CHUNKSIZE = 100000
+
+# Default connect and read timeouts, in seconds, of every HTTP request.
+DEFAULT_TIMEOUT = (10, 60)
+
+# Default sizes of the client's HTTP connection pools.
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+# Default number of results downloaded at once by
+# `AqueductClient.get_pipeline_results_dataframes`.
+DEFAULT_MAX_WORKERS = 8
+
+# Default size, in bytes, from which results are parsed in a separate
+# process by `AqueductClient.get_pipeline_results_dataframes`.
+DEFAULT_PROCESS_PARSE_THRESHOLD = 64 * 1024 * 1024
+
+# Default number of times a dropped or expired results download is resumed.
+DEFAULT_DOWNLOAD_RETRIES = 3
+
+# Default number of byte ranges in which a single results object is
+# downloaded at once, and the size, in bytes, from which it is split.
+DEFAULT_DOWNLOAD_PARTS = 1
+DEFAULT_DOWNLOAD_PART_THRESHOLD = 64 * 1024 * 1024
+
+# Statuses with which storage hosts reject expired signed urls.
+_EXPIRED_URL_STATUSES = (400, 401, 403)
+
+# Errors after which a results download can be resumed.
+_RESUMABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
 )
 
-from .errors import ConcurrentExecutionsExceeded
+# Default bounds, in seconds, on the interval between status checks while
+# waiting for pipeline executions to finish.
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_MAX_POLL_INTERVAL = 30.0
+
+# Values of `return_when` for `AqueductClient.wait_for_executions`.
+FIRST_COMPLETED = 'FIRST_COMPLETED'
+ALL_COMPLETED = 'ALL_COMPLETED'
 
 
 def create_client(
     api_key=None,
-    base_url="https://factset.quantopian.com/api/experimental/pipelines"
+    base_url="https://factset.quantopian.com/api/experimental/pipelines",
+    **kwargs
 ):
     """
     Create an AqueductClient.
@@ -34,34 +116,346 @@ def create_client(
     base_url : str, optional
         The base URL for the Aqueduct API.  Defaults to the
         FactSet Aqueduct endpoint.
+
+    **kwargs
+        Any other options, such as `cache_dir`, are passed through to
+        AqueductClient.
     """
     if api_key is None:
         api_key = load_api_key()
 
     return AqueductClient(
         api_key=api_key,
-        base_url=base_url
+        base_url=base_url,
+        **kwargs
+    )
+
+
+def _parse_in_pool(process_pool, *args):
+    """
+    Parses pipeline results in `process_pool`, waiting for the result.
+    """
+    from .results import read_results_file
+
+    return process_pool.submit(read_results_file, *args).result()
+
+
+def _make_session(pool_connections, pool_maxsize):
+    """
+    Creates a requests session whose connection pools hold
+    `pool_maxsize` connections to each of `pool_connections` hosts.
+    """
+    session = requests.Session()
+
+    # results compress very well, so ask for every content encoding that
+    # urllib3 can decode here (gzip and deflate, plus br and zstd when
+    # their libraries are installed).
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
     )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+def _deadline_after(seconds):
+    """
+    Returns the time at which a deadline of `seconds` from now expires,
+    along with `seconds`, or None if there is no deadline.
+    """
+    if seconds is None:
+        return None
+
+    return monotonic() + seconds, seconds
+
+
+def _request_phase(method, path):
+    """
+    Returns the name under which a request to the API is instrumented.
+    """
+    if path == '':
+        return 'submit' if method == 'POST' else 'executions'
+    if path == '/concurrent_executions_info':
+        return 'quota'
+    if path.endswith('/results_url'):
+        return 'results_url'
+    if path.endswith('/exception'):
+        return 'exception'
+    return 'status'
+
+
+def _truncate(path):
+    with open(path, 'wb'):
+        pass
+
+
+def _make_submission_args(code,
+                          start_date,
+                          end_date,
+                          name,
+                          params,
+                          asset_identifier_format,
+                          result_format=None):
+    """
+    Validates the arguments of a new pipeline execution, and returns the
+    body with which it should be submitted.
+    """
+    if params is None:
+        params = {}
+
+    start_date = normalize_date_input(start_date)
+    end_date = normalize_date_input(end_date)
+
+    if end_date < start_date:
+        raise ValueError(
+            "end_date ({end}) must be on or after start_date "
+            "({start})!".format(
+                end=end_date,
+                start=start_date
+            )
+        )
+
+    if asset_identifier_format not in ASSET_IDENTIFIER_FORMATS:
+        raise ValueError(
+            "Invalid asset_identifier_format, should be symbol, "
+            "sid, or fsym_region_id."
+        )
+
+    args = {
+        "code": code,
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "asset_identifier_format": asset_identifier_format,
+        "params": params,
+        "name": name,
+    }
+
+    if result_format is not None:
+        _check_result_format(result_format)
+        args["result_format"] = result_format
+
+    return args
+
+
+def _check_job(code,
+               start_date,
+               end_date,
+               name=None,
+               params=None,
+               asset_identifier_format="sid",
+               result_format=None,
+               deadline=None):
+    """
+    Validates the keyword arguments of a `submit_pipeline_execution` call
+    without making it.
+    """
+    _make_submission_args(
+        code,
+        start_date,
+        end_date,
+        name,
+        params,
+        asset_identifier_format,
+        result_format,
+    )
+
+
+def _check_result_format(result_format):
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(
+            "Invalid result_format, should be csv, parquet, or arrow."
+        )
+
+
+def _check_finished_successfully(pipeline_status, execution_id):
+    """
+    Raises if the given pipeline execution metadata does not describe a
+    successfully finished execution.
+    """
+    if pipeline_status["status"] == "IN-PROGRESS":
+        raise ValueError(
+            "Pipeline execution {execution_id} is still running!".format(
+                execution_id=execution_id
+            )
+        )
+    elif pipeline_status["status"] == "FAILED":
+        raise ValueError(
+            "Pipeline {execution_id} ended in error, use "
+            "`get_pipeline_execution_error` "
+            "to get its error message.".format(execution_id=execution_id)
+        )
 
 
 class AqueductClient(object):
     """
     AqueductClient provides a convenient way to use Quantopian's
     Aqueduct API.
+
+    Parameters
+    ----------
+    api_key : str
+        The Quantopian API key to use.
+
+    base_url : str
+        The base URL for the Aqueduct API.
+
+    cache_dir : str, optional
+        A directory in which to cache the results of successful pipeline
+        executions, such as ~/.quantopian/cache.  If not given, results
+        are downloaded every time they are loaded.
+
+    cache_max_size : int, optional
+        The maximum size of the results cache, in bytes.  The least recently
+        used results are evicted once it grows past this size.
+
+    metadata_cache_size : int, optional
+        The number of pipeline executions whose metadata is cached in
+        memory.  Pass 0 to always fetch metadata from the API.
+
+    in_progress_ttl : float, optional
+        The number of seconds for which the cached metadata of a running
+        pipeline execution is used before it is fetched again.  The metadata
+        of finished executions is cached until evicted.
+
+    pool_connections : int, optional
+        The number of hosts for which connections are kept open.
+
+    pool_maxsize : int, optional
+        The number of connections kept open to each host.  This should be
+        at least the number of threads sharing the client.
+
+    download_retries : int, optional
+        The number of times a results download that drops, or whose url
+        expires, is resumed before giving up.  With a ``cache_dir``, the
+        partial download is also kept there, to be resumed by the next load
+        of the same results.
+
+    download_parts : int, optional
+        The number of byte ranges in which large results are downloaded
+        concurrently.  Servers that don't support range requests are read
+        in a single stream.  ``pool_maxsize`` should be at least this
+        number.
+
+    download_part_threshold : int, optional
+        The size, in bytes, from which results are downloaded in
+        ``download_parts`` ranges.
+
+    retry_policy : aqueduct_client.retry.RetryPolicy, optional
+        Decides which failed API requests are retried, and when.  By
+        default, GET requests are retried up to 3 times after connection
+        errors, 429 and 5xx responses.  Pass ``RetryPolicy(max_retries=0)``
+        to never retry.
+
+    rate_limiter : object, optional
+        Limits the rate of requests to the API, such as a
+        ``aqueduct_client.ratelimit.TokenBucket`` shared by several clients
+        in a process, or a ``FileTokenBucket`` shared by several processes.
+        Its ``acquire()`` method is called before every request, including
+        retries; during a call with a ``deadline``, it is called as
+        ``acquire(timeout=seconds_left)`` and must return False if it could
+        not acquire in time.  Results downloads are not limited.
+
+    timeout : float or (float, float), optional
+        The connect and read timeouts, in seconds, of every HTTP request,
+        including results downloads.  The read timeout bounds each wait for
+        data, not a whole download; pass ``deadline`` to a method to bound
+        the whole call.  Pass None to wait indefinitely.
+
+    hooks : list, optional
+        Objects notified of the client's requests, downloads, retries and
+        cache lookups, such as the ``StatsDHooks`` and
+        ``OpenTelemetryHooks`` of ``aqueduct_client.instrumentation``.
+        The client always keeps its own statistics; see `stats`.
     """
-    def __init__(self, api_key, base_url):
+    def __init__(self,
+                 api_key,
+                 base_url,
+                 cache_dir=None,
+                 cache_max_size=DEFAULT_CACHE_MAX_SIZE,
+                 metadata_cache_size=DEFAULT_METADATA_CACHE_SIZE,
+                 in_progress_ttl=DEFAULT_IN_PROGRESS_TTL,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 download_retries=DEFAULT_DOWNLOAD_RETRIES,
+                 download_parts=DEFAULT_DOWNLOAD_PARTS,
+                 download_part_threshold=DEFAULT_DOWNLOAD_PART_THRESHOLD,
+                 retry_policy=None,
+                 rate_limiter=None,
+                 timeout=DEFAULT_TIMEOUT,
+                 hooks=None):
         self._base_url = base_url
         self._api_key = api_key
-        self._session = requests.Session()
-        self._session.headers = {'Quantopian-API-Key': self._api_key}
+        self._session = _make_session(pool_connections, pool_maxsize)
+        self._session.headers['Quantopian-API-Key'] = self._api_key
+        self._retry_policy = (
+            retry_policy if retry_policy is not None else RetryPolicy()
+        )
+        self._rate_limiter = rate_limiter
+        self._timeout = timeout
+
+        # the deadline of the public call being made by each thread, if any
+        self._local = threading.local()
+
+        self._stats = ClientStats()
+        self._hooks = [self._stats]
+        if hooks is not None:
+            self._hooks.extend(hooks)
+
+        # results are downloaded from signed urls on a separate storage
+        # host, through a session that never carries our API key.
+        self._download_session = _make_session(
+            pool_connections,
+            pool_maxsize,
+        )
+        self._download_retries = download_retries
+        self._download_parts = download_parts
+        self._download_part_threshold = download_part_threshold
+
+        if cache_dir is not None:
+            self._results_cache = ResultsCache(cache_dir, cache_max_size)
+        else:
+            self._results_cache = None
+
+        self._metadata_cache = ExecutionMetadataCache(
+            metadata_cache_size,
+            in_progress_ttl,
+        )
+        self._schema_cache = SchemaCache()
+
+    def stats(self, reset=False):
+        """
+        Returns statistics about the client's work so far: how long each
+        phase took, how many bytes were received, how many requests were
+        retried, and how often the caches were hit.
+
+        Parameters
+        ----------
+        reset : bool, optional
+            If True, start counting afresh once the statistics are taken.
+
+        Returns
+        -------
+        dict
+            See `aqueduct_client.instrumentation.ClientStats.snapshot`.
+        """
+        snapshot = self._stats.snapshot()
+        if reset:
+            self._stats.reset()
+        return snapshot
 
-    def get_all_pipeline_executions(self):
+    def get_all_pipeline_executions(self, deadline=None):
         """
         Returns the metadata of all the pipeline executions you've run.
 
         Parameters
         ----------
-        None
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries.  If it runs out, DeadlineExceeded is raised.
 
         Returns
         -------
@@ -71,12 +465,17 @@ class AqueductClient(object):
             status, and other properties. See `get_pipeline_execution` for
             a sample dict.
         """
-        response = self._get('')
-        response.raise_for_status()
-        pipelines = response.json()['pipelines']
-        return pipelines
+        with self._deadline(deadline):
+            response = self._get('')
+            response.raise_for_status()
+            pipelines = response.json()['pipelines']
+
+            for pipeline in pipelines:
+                self._metadata_cache.put(pipeline)
 
-    def get_pipeline_execution(self, execution_id):
+            return pipelines
+
+    def get_pipeline_execution(self, execution_id, deadline=None):
         """
         Returns the metadata of a single pipeline execution.
 
@@ -84,6 +483,9 @@ class AqueductClient(object):
         ----------
         id : str
             The id of the pipeline execution to load.
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries.  If it runs out, DeadlineExceeded is raised.
 
         Returns
         -------
@@ -103,21 +505,25 @@ class AqueductClient(object):
                 "name": "First Pipeline Execution",
             }
         """
-        response = self._get('/{execution_id}'.format(
-            execution_id=execution_id
-        ))
-        response.raise_for_status()
-        pipeline = response.json()['pipeline']
-        return pipeline
+        with self._deadline(deadline):
+            pipeline = self._metadata_cache.get(execution_id)
+            if self._metadata_cache.max_entries > 0:
+                self._emit('on_cache', 'metadata', pipeline is not None)
+            if pipeline is not None:
+                return pipeline
+
+            return self._fetch_pipeline_execution(execution_id)
 
-    def get_pipeline_execution_quota(self):
+    def get_pipeline_execution_quota(self, deadline=None):
         """
         Returns the number of currently active (queued or running)
         pipeline executions, and what the quota is.
 
         Parameters
         ----------
-        None
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries.  If it runs out, DeadlineExceeded is raised.
 
         Returns
         -------
@@ -128,9 +534,10 @@ class AqueductClient(object):
                 The number of pipeline executions that are queued or
                 running.
         """
-        response = self._get("/concurrent_executions_info")
-        response.raise_for_status()
-        return response.json()
+        with self._deadline(deadline):
+            response = self._get("/concurrent_executions_info")
+            response.raise_for_status()
+            return response.json()
 
     def submit_pipeline_execution(self,
                                   code,
@@ -138,7 +545,9 @@ class AqueductClient(object):
                                   end_date,
                                   name=None,
                                   params=None,
-                                  asset_identifier_format="sid"):
+                                  asset_identifier_format="sid",
+                                  result_format=None,
+                                  deadline=None):
         """
         Creates and queues a new pipeline execution.
 
@@ -157,60 +566,389 @@ class AqueductClient(object):
         asset_identifier_format : str (optional)
             The type of identifier used to identify a security.
             Valid options are "symbol", "sid", or "fsym_region_id".
+        result_format : str (optional)
+            The format in which the server should store the results.
+            Valid options are "csv", "parquet", or "arrow".  If not given,
+            the server's default, csv, is used.
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries.  If it runs out, DeadlineExceeded is raised.
 
         Returns
         ----------
         execution_id : str
             The ID of the newly submitted pipeline execution.
         """
+        with self._deadline(deadline):
+            args = _make_submission_args(
+                code,
+                start_date,
+                end_date,
+                name,
+                params,
+                asset_identifier_format,
+                result_format,
+            )
 
-        if params is None:
-            params = {}
+            response = self._post('', args)
 
-        start_date = normalize_date_input(start_date)
-        end_date = normalize_date_input(end_date)
+            if response.status_code == 429:
+                # concurrent execution quota exceeded
+                data = json.loads(response.text)
+                raise ConcurrentExecutionsExceeded(
+                    data["current"],
+                    data["allowed"],
+                )
+            else:
+                response.raise_for_status()
 
-        if end_date < start_date:
-            raise ValueError(
-                "end_date ({end}) must be on or after start_date "
-                "({start})!".format(
-                    end=end_date,
-                    start=start_date
+            created_execution_id = response.json()['pipeline_id']
+
+            return created_execution_id
+
+    def submit_many(self,
+                    jobs,
+                    poll_interval=DEFAULT_POLL_INTERVAL,
+                    max_interval=DEFAULT_MAX_POLL_INTERVAL,
+                    deadline=None):
+        """
+        Creates and queues a batch of pipeline executions, keeping as many
+        of them queued or running as the concurrent execution quota allows.
+
+        Whenever the quota is full, we poll it with jittered exponential
+        backoff, and submit the next job as soon as a slot frees up.
+
+        Parameters
+        ----------
+        jobs : iterable of dict
+            The executions to submit, each given as a dict of keyword
+            arguments for `submit_pipeline_execution`.
+        poll_interval : float, optional
+            The initial number of seconds between quota checks while the
+            quota is full.
+        max_interval : float, optional
+            The maximum number of seconds between quota checks while the
+            quota is full.
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries and quota checks.  If it runs out, DeadlineExceeded is
+            raised.
+
+        Raises
+        ------
+        ValueError
+            If any of the jobs is invalid, in which case none of them are
+            submitted.
+
+        Any other error raised once submission has started has a
+        `submitted_execution_ids` attribute, listing the IDs of the jobs
+        that were submitted before it, which keep running.
+
+        Returns
+        ----------
+        execution_ids : list of str
+            The IDs of the newly submitted pipeline executions, in the
+            same order as `jobs`.
+        """
+        # check every job before submitting any, so that a bad job can't
+        # leave the ones before it running without the caller knowing.
+        jobs = list(jobs)
+        for job in jobs:
+            _check_job(**job)
+
+        execution_ids = []
+        try:
+            with self._deadline(deadline):
+                free_slots = 0
+
+                for job in jobs:
+                    intervals = backoff_intervals(poll_interval, max_interval)
+
+                    while True:
+                        if free_slots <= 0:
+                            quota = self.get_pipeline_execution_quota()
+                            free_slots = quota["maximum"] - quota["running"]
+
+                        if free_slots > 0:
+                            try:
+                                execution_id = \
+                                    self.submit_pipeline_execution(**job)
+                            except ConcurrentExecutionsExceeded:
+                                # someone else took the slot we thought was
+                                # free
+                                free_slots = 0
+                            else:
+                                free_slots -= 1
+                                break
+
+                        self._sleep_until_next_poll(intervals, None)
+
+                    execution_ids.append(execution_id)
+        except BaseException as e:
+            e.submitted_execution_ids = execution_ids
+            raise
+
+        return execution_ids
+
+    def submit_sharded_pipeline_execution(
+            self,
+            code,
+            start_date,
+            end_date,
+            shard="1Y",
+            name=None,
+            params=None,
+            asset_identifier_format="sid",
+            result_format=None,
+            poll_interval=DEFAULT_POLL_INTERVAL,
+            max_interval=DEFAULT_MAX_POLL_INTERVAL,
+            deadline=None):
+        """
+        Runs a pipeline over a long date range as several shorter
+        executions that run in parallel, and loads their combined results.
+
+        The date range is split into consecutive shards, which are
+        submitted with `submit_many` so that as many run at once as the
+        concurrent execution quota allows.  The results of each shard are
+        downloaded as soon as it finishes.
+
+        Parameters
+        ----------
+        code : str
+            The pipeline code to run.
+        start_date : date-like
+            Execution start date.
+        end_date : date-like
+            Execution end date.
+        shard : str, optional
+            A pandas frequency string, such as "1Y", "Q" or "90D", giving
+            the length of each shard.  Calendar frequencies are aligned to
+            calendar boundaries.
+        name : str, optional
+            Human-readable name of the pipeline execution.  Each shard's
+            name is suffixed with its date range.
+        params : dict, optional
+            Input arguments for make_pipeline method defined in code.
+        asset_identifier_format : str (optional)
+            The type of identifier used to identify a security.
+            Valid options are "symbol", "sid", or "fsym_region_id".
+        result_format : str (optional)
+            The format in which the shards' results should be stored and
+            downloaded.  Valid options are "csv", "parquet", or "arrow".
+        poll_interval : float, optional
+            The initial number of seconds between status checks.
+        max_interval : float, optional
+            The maximum number of seconds between status checks.
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries, polling and downloads.  If it runs out, DeadlineExceeded
+            is raised.
+
+        Raises
+        ------
+        ValueError
+            If any of the shards ended in error.
+
+        Returns
+        -------
+        pd.DataFrame
+            A dataframe holding the result over the whole date range,
+            indexed by date and the asset identifier format.
+        """
+        with self._deadline(deadline):
+            start_date = normalize_date_input(start_date)
+            end_date = normalize_date_input(end_date)
+
+            if end_date < start_date:
+                raise ValueError(
+                    "end_date ({end}) must be on or after start_date "
+                    "({start})!".format(
+                        end=end_date,
+                        start=start_date
+                    )
                 )
-            )
 
-        if asset_identifier_format not in ("symbol", "sid", "fsym_region_id"):
-            raise ValueError(
-                "Invalid asset_identifier_format, should be symbol, "
-                "sid, or fsym_region_id."
+            jobs = []
+            for shard_start, shard_end in split_date_range(
+                start_date,
+                end_date,
+                shard,
+            ):
+                if name is not None:
+                    shard_name = "{name} [{start} - {end}]".format(
+                        name=name,
+                        start=shard_start,
+                        end=shard_end,
+                    )
+                else:
+                    shard_name = None
+
+                jobs.append({
+                    "code": code,
+                    "start_date": shard_start,
+                    "end_date": shard_end,
+                    "name": shard_name,
+                    "params": params,
+                    "asset_identifier_format": asset_identifier_format,
+                    "result_format": result_format,
+                })
+
+            execution_ids = self.submit_many(
+                jobs,
+                poll_interval=poll_interval,
+                max_interval=max_interval,
             )
 
-        args = {
-            "code": code,
-            "start_date": start_date.strftime("%Y-%m-%d"),
-            "end_date": end_date.strftime("%Y-%m-%d"),
-            "asset_identifier_format": asset_identifier_format,
-            "params": params,
-            "name": name,
-        }
-
-        response = self._post('', args)
-
-        if response.status_code == 429:
-            # concurrent execution quota exceeded
-            data = json.loads(response.text)
-            raise ConcurrentExecutionsExceeded(
-                data["current"],
-                data["allowed"],
+            results = {}
+            for pipeline in self.wait_for_executions(
+                execution_ids,
+                poll_interval=poll_interval,
+                max_interval=max_interval,
+            ):
+                results[pipeline["id"]] = self.get_pipeline_results_dataframe(
+                    pipeline["id"],
+                    result_format=result_format,
+                )
+
+            import pandas as pd
+
+            result_df = pd.concat(
+                [results[execution_id] for execution_id in execution_ids],
             )
-        else:
-            response.raise_for_status()
 
-        created_execution_id = response.json()['pipeline_id']
+            # shards don't overlap, but guard against the server emitting a
+            # boundary date in both of its neighbouring shards.
+            result_df = result_df[~result_df.index.duplicated(keep="first")]
+
+            return result_df.sort_index(level="date", sort_remaining=False)
+
+    def wait_for_execution(self,
+                           execution_id,
+                           timeout=None,
+                           poll_interval=DEFAULT_POLL_INTERVAL,
+                           max_interval=DEFAULT_MAX_POLL_INTERVAL,
+                           fetch_results=False,
+                           deadline=None):
+        """
+        Blocks until a pipeline execution has finished.
+
+        The execution's status is polled with jittered exponential backoff,
+        starting at `poll_interval` seconds and growing to at most
+        `max_interval` seconds between checks.
+
+        Parameters
+        ----------
+        execution_id : str
+            The id of the pipeline execution to wait for.
+        timeout : float, optional
+            The maximum number of seconds to wait.  If not given, we wait
+            indefinitely.
+        poll_interval : float, optional
+            The initial number of seconds between status checks.
+        max_interval : float, optional
+            The maximum number of seconds between status checks.
+        fetch_results : bool, optional
+            If True, load and return the results of the execution once it
+            has finished, as `get_pipeline_results_dataframe` would.
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries and polling.  If it runs out, DeadlineExceeded is raised.
+
+        Raises
+        ------
+        PipelineExecutionTimeout
+            If the execution did not finish within `timeout` seconds.
+
+        Returns
+        -------
+        dict or pd.DataFrame
+            The final metadata of the pipeline execution (see
+            `get_pipeline_execution`), or its results if `fetch_results`
+            is True.
+        """
+        with self._deadline(deadline):
+            timeout_at = None if timeout is None else monotonic() + timeout
+            intervals = backoff_intervals(poll_interval, max_interval)
+
+            pipeline = self.get_pipeline_execution(execution_id)
+            while pipeline["status"] not in FINISHED_STATUSES:
+                if not self._sleep_until_next_poll(intervals, timeout_at):
+                    raise PipelineExecutionTimeout([execution_id], timeout)
+
+                pipeline = self._fetch_pipeline_execution(execution_id)
+
+            if fetch_results:
+                return self.get_pipeline_results_dataframe(execution_id)
+
+            return pipeline
+
+    def wait_for_executions(self,
+                            execution_ids,
+                            return_when=ALL_COMPLETED,
+                            timeout=None,
+                            poll_interval=DEFAULT_POLL_INTERVAL,
+                            max_interval=DEFAULT_MAX_POLL_INTERVAL,
+                            deadline=None):
+        """
+        Waits for several pipeline executions, yielding each one as soon
+        as it has finished.
+
+        Rather than checking each execution individually, every poll loads
+        the status of all executions at once with
+        `get_all_pipeline_executions`.
+
+        Parameters
+        ----------
+        execution_ids : list of str
+            The ids of the pipeline executions to wait for.
+        return_when : str, optional
+            ALL_COMPLETED to wait for every execution, or FIRST_COMPLETED
+            to stop after the first poll in which any execution finished.
+        timeout : float, optional
+            The maximum number of seconds to wait.  If not given, we wait
+            indefinitely.
+        poll_interval : float, optional
+            The initial number of seconds between status checks.
+        max_interval : float, optional
+            The maximum number of seconds between status checks.
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries and polling.  If it runs out, DeadlineExceeded is raised.
+
+        Raises
+        ------
+        PipelineExecutionTimeout
+            If the executions did not finish within `timeout` seconds.
+
+        Returns
+        -------
+        iterator[dict]
+            The final metadata of each pipeline execution (see
+            `get_pipeline_execution`), in the order in which they finished.
+        """
+        if return_when not in (ALL_COMPLETED, FIRST_COMPLETED):
+            raise ValueError(
+                "Invalid return_when, should be ALL_COMPLETED or "
+                "FIRST_COMPLETED."
+            )
 
-        return created_execution_id
+        return self._iter_finished_executions(
+            execution_ids,
+            return_when,
+            timeout,
+            poll_interval,
+            max_interval,
+            _deadline_after(deadline),
+        )
 
-    def get_pipeline_results_dataframe(self, execution_id):
+    def get_pipeline_results_dataframe(self,
+                                       execution_id,
+                                       compact=False,
+                                       result_format=None,
+                                       columns=None,
+                                       start=None,
+                                       end=None,
+                                       deadline=None):
         """
         Gets the result of this pipeline in a pandas dataframe.
 
@@ -218,6 +956,26 @@ class AqueductClient(object):
         ----------
         execution_id : str
             The id of the pipeline execution whose results should be loaded.
+        compact : bool, optional
+            If True, shrink the dataframe by storing float columns as
+            float32 where their values fit, and string columns as
+            categoricals.
+        result_format : str, optional
+            The format in which to download the results: "csv", "parquet",
+            or "arrow".  Columnar formats are read without any text parsing,
+            but require pyarrow; if it is not installed, or the server
+            cannot provide the format, the results are loaded from csv.
+        columns : list of str, optional
+            The pipeline columns to load.  If not given, all columns are
+            loaded.
+        start : date-like, optional
+            The first date whose results should be loaded.
+        end : date-like, optional
+            The last date whose results should be loaded.
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries and the download.  If it runs out, DeadlineExceeded is
+            raised.
 
         Returns
         -------
@@ -225,46 +983,171 @@ class AqueductClient(object):
             A dataframe holding the result, indexed by date and the
             asset identifier format (symbol, sid, or fsym_region_id)
             that this pipeline used.
+
+        Notes
+        -----
+        When `columns`, `start` or `end` are given, only the selected
+        results are parsed, and they are not added to the results cache.
         """
-        pipeline_status = self.get_pipeline_execution(execution_id)
-        if pipeline_status["status"] == "IN-PROGRESS":
-            raise ValueError(
-                "Pipeline execution {execution_id} is still running!".format(
-                    execution_id=execution_id
-                )
-            )
-        elif pipeline_status["status"] == "FAILED":
-            raise ValueError(
-                "Pipeline {execution_id} ended in error, use "
-                "`get_pipeline_execution_error` "
-                "to get its error message.".format(execution_id=execution_id)
+        with self._deadline(deadline):
+            return self._load_results(
+                execution_id,
+                compact=compact,
+                result_format=result_format,
+                columns=columns,
+                start=start,
+                end=end,
             )
 
-        asset_identifier_format = pipeline_status["asset_identifier_format"]
+    def get_pipeline_results_dataframes(
+            self,
+            execution_ids,
+            max_workers=DEFAULT_MAX_WORKERS,
+            parse_processes=None,
+            process_parse_threshold=DEFAULT_PROCESS_PARSE_THRESHOLD,
+            concat=False,
+            compact=False,
+            result_format=None,
+            columns=None,
+            start=None,
+            end=None,
+            deadline=None):
+        """
+        Gets the results of several pipelines in pandas dataframes.
 
-        # now that we know the pipeline isn't still running, get its results
-        response = self._get('/{execution_id}/results_url'.format(
-            base=self._base_url,
-            execution_id=execution_id
-        ))
+        The metadata lookups and downloads for each pipeline run in a pool
+        of threads.  Results larger than `process_parse_threshold` bytes
+        are parsed in a pool of processes, so that parsing is not limited
+        to a single core.
+
+        Parameters
+        ----------
+        execution_ids : list of str
+            The ids of the pipeline executions whose results should be
+            loaded.
+        max_workers : int, optional
+            The number of results to download at once.
+        parse_processes : int, optional
+            The number of processes in which large results are parsed.
+            Defaults to the number of CPUs.
+        process_parse_threshold : int, optional
+            The size, in bytes, from which a result is parsed in a separate
+            process.  Pass None to parse every result in this process.
+        concat : bool, optional
+            If True, return a single dataframe with an outer `execution_id`
+            index level, rather than a dict.
+        compact : bool, optional
+            If True, shrink each dataframe as `get_pipeline_results_dataframe`
+            does.
+        result_format : str, optional
+            The format in which to download the results, as for
+            `get_pipeline_results_dataframe`.
+        columns : list of str, optional
+            The pipeline columns to load.  If not given, all columns are
+            loaded.
+        start : date-like, optional
+            The first date whose results should be loaded.
+        end : date-like, optional
+            The last date whose results should be loaded.
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries and downloads.  If it runs out, DeadlineExceeded is raised.
 
-        url = response.json()['url']
+        Returns
+        -------
+        dict[str, pd.DataFrame] or pd.DataFrame
+            The results of each pipeline execution, keyed by execution id
+            (see `get_pipeline_results_dataframe`), or concatenated into one
+            dataframe if `concat` is True.
+        """
+        with self._deadline(deadline):
+            execution_ids = list(OrderedDict.fromkeys(execution_ids))
 
-        # get the data from the url
-        results_url_resp = requests.get(url)
+            if process_parse_threshold is not None:
+                process_pool = ProcessPoolExecutor(parse_processes)
+            else:
+                process_pool = None
 
-        if results_url_resp.status_code != 200:
-            raise ValueError("Could not download results from given url.")
+            try:
+                with ThreadPoolExecutor(max_workers) as thread_pool:
+                    futures = [
+                        thread_pool.submit(
+                            self._call_with_bound,
+                            getattr(self._local, 'bound', None),
+                            self._load_results,
+                            execution_id,
+                            compact=compact,
+                            result_format=result_format,
+                            columns=columns,
+                            start=start,
+                            end=end,
+                            process_pool=process_pool,
+                            process_parse_threshold=process_parse_threshold,
+                        )
+                        for execution_id in execution_ids
+                    ]
+                    results = OrderedDict(
+                        (execution_id, future.result())
+                        for execution_id, future in zip(execution_ids, futures)
+                    )
+            finally:
+                if process_pool is not None:
+                    process_pool.shutdown()
 
-        result_df = pd.read_csv(
-            StringIO(results_url_resp.text),
-            index_col=['date', asset_identifier_format],
-            parse_dates=['date'],
-        )
+            if concat:
+                import pandas as pd
 
-        return result_df
+                # empty results can't tell the dtypes of their index, such
+                # as the timezone of their dates, so they would turn the
+                # concatenated index into objects.
+                nonempty = OrderedDict(
+                    (execution_id, result_df)
+                    for execution_id, result_df in results.items()
+                    if len(result_df)
+                )
+                return pd.concat(nonempty or results, names=['execution_id'])
+
+            return results
+
+    def get_pipeline_results_iter(self,
+                                  execution_id,
+                                  chunksize=None,
+                                  compact=False):
+        """
+        Lazily loads the result of this pipeline, one pandas dataframe at
+        a time, without holding the full result in memory.
+
+        Parameters
+        ----------
+        execution_id : str
+            The id of the pipeline execution whose results should be loaded.
+        chunksize : int, optional
+            The number of rows in each yielded dataframe.  If not given,
+            one dataframe is yielded per date.
+        compact : bool, optional
+            If True, shrink each dataframe as `get_pipeline_results_dataframe`
+            does.
 
-    def get_pipeline_execution_error(self, execution_id):
+        Returns
+        -------
+        iterator[pd.DataFrame]
+            An iterator of dataframes, each indexed by date and the asset
+            identifier format that this pipeline used.
+        """
+        pipeline_status = self._get_finished_pipeline_execution(execution_id)
+        asset_identifier_format = pipeline_status["asset_identifier_format"]
+
+        url = self._get_results_url(execution_id)
+
+        return self._iter_results(
+            execution_id,
+            url,
+            asset_identifier_format,
+            chunksize,
+            compact,
+        )
+
+    def get_pipeline_execution_error(self, execution_id, deadline=None):
         """
         Gets the error that caused this pipeline to fail to complete
         successfully.
@@ -273,6 +1156,9 @@ class AqueductClient(object):
         ----------
         execution_id : str
             The id of the pipeline execution whose errors should be loaded.
+        deadline : float, optional
+            The maximum number of seconds this call may take, including any
+            retries.  If it runs out, DeadlineExceeded is raised.
 
         Returns
         -------
@@ -280,29 +1166,832 @@ class AqueductClient(object):
             A dictionary that can contain `date`, `name`, `message`,
             `lineno`, `method` keys.
         """
-        pipeline_status = self.get_pipeline_execution(execution_id)
-        if pipeline_status["status"] != "FAILED":
-            raise ValueError(
-                "Pipeline execution {execution_id} did not end in "
-                "error!".format(execution_id=execution_id)
+        with self._deadline(deadline):
+            pipeline_status = self.get_pipeline_execution(execution_id)
+            if pipeline_status["status"] != "FAILED":
+                raise ValueError(
+                    "Pipeline execution {execution_id} did not end in "
+                    "error!".format(execution_id=execution_id)
+                )
+
+            # get the error
+            response = self._get(
+                '/{execution_id}/exception'.format(execution_id=execution_id),
             )
 
-        # get the error
+            response.raise_for_status()
+
+            return response.json()
+
+    def _fetch_pipeline_execution(self, execution_id):
+        """
+        Loads the metadata of a single pipeline execution from the API,
+        bypassing and then refreshing the metadata cache.
+        """
+        response = self._get('/{execution_id}'.format(
+            execution_id=execution_id
+        ))
+        response.raise_for_status()
+        pipeline = response.json()['pipeline']
+
+        self._metadata_cache.put(pipeline)
+
+        return pipeline
+
+    def _iter_finished_executions(self,
+                                  execution_ids,
+                                  return_when,
+                                  timeout,
+                                  poll_interval,
+                                  max_interval,
+                                  bound):
+        timeout_at = None if timeout is None else monotonic() + timeout
+        intervals = backoff_intervals(poll_interval, max_interval)
+
+        # executions we already know to be finished need no polling at all.
+        # The rest are kept in an ordered set, as there may be thousands.
+        pending = OrderedDict()
+        finished = []
+        for execution_id in OrderedDict.fromkeys(execution_ids):
+            pipeline = self._metadata_cache.get(execution_id)
+            if pipeline is not None and \
+                    pipeline["status"] in FINISHED_STATUSES:
+                finished.append(pipeline)
+            else:
+                pending[execution_id] = None
+
+        polled = False
+        while True:
+            for pipeline in finished:
+                yield pipeline
+
+            if not pending or (finished and return_when == FIRST_COMPLETED):
+                return
+
+            # the deadline mustn't apply to the caller's code between yields
+            with self._deadline_bound(bound):
+                if polled and not self._sleep_until_next_poll(
+                    intervals,
+                    timeout_at,
+                ):
+                    raise PipelineExecutionTimeout(list(pending), timeout)
+                polled = True
+
+                pipelines = {
+                    pipeline["id"]: pipeline
+                    for pipeline in self.get_all_pipeline_executions()
+                }
+
+                finished = []
+                for execution_id in list(pending):
+                    pipeline = pipelines.get(execution_id)
+                    if pipeline is None:
+                        pipeline = self._fetch_pipeline_execution(
+                            execution_id,
+                        )
+
+                    if pipeline["status"] in FINISHED_STATUSES:
+                        finished.append(pipeline)
+                        del pending[execution_id]
+
+    def _sleep_until_next_poll(self, intervals, timeout_at):
+        """
+        Sleeps for the next interval from `intervals`, without sleeping past
+        `timeout_at` or the current call's deadline.  Returns False, without
+        sleeping, if `timeout_at` has already passed.
+        """
+        delay = next(intervals)
+
+        if timeout_at is not None:
+            remaining = timeout_at - monotonic()
+            if remaining <= 0:
+                return False
+            delay = min(delay, remaining)
+
+        remaining = self._remaining()
+        if remaining is not None:
+            delay = min(delay, remaining)
+
+        time.sleep(delay)
+        return True
+
+    def _call_with_bound(self, bound, func, *args, **kwargs):
+        # runs `func` in a worker thread under its caller's deadline
+        with self._deadline_bound(bound):
+            return func(*args, **kwargs)
+
+    def _deadline(self, seconds):
+        """
+        Returns a context manager within which the calls made by this thread
+        must finish within `seconds`, or raise DeadlineExceeded.  An
+        enclosing deadline that expires sooner takes precedence.
+        """
+        return self._deadline_bound(_deadline_after(seconds))
+
+    @contextmanager
+    def _deadline_bound(self, bound):
+        """
+        Like `_deadline`, but takes a bound from `_deadline_after`, so that
+        the same deadline can be applied in several places.
+        """
+        previous = getattr(self._local, 'bound', None)
+        if bound is None or (previous is not None and previous[0] <= bound[0]):
+            yield
+            return
+
+        self._local.bound = bound
+        try:
+            yield
+        finally:
+            self._local.bound = previous
+
+    def _remaining(self):
+        """
+        Returns the number of seconds left before the current call's
+        deadline, or None if it has none.  Raises DeadlineExceeded if it
+        has passed.
+        """
+        bound = getattr(self._local, 'bound', None)
+        if bound is None:
+            return None
+
+        expires_at, seconds = bound
+        remaining = expires_at - monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(seconds)
+
+        return remaining
+
+    def _request_timeout(self):
+        """
+        Returns the timeout for the next HTTP request: the client's timeout,
+        shortened to the time left before the current call's deadline.
+        """
+        remaining = self._remaining()
+        if remaining is None:
+            return self._timeout
+
+        if self._timeout is None:
+            return remaining
+
+        if isinstance(self._timeout, tuple):
+            return tuple(
+                remaining if t is None else min(t, remaining)
+                for t in self._timeout
+            )
+
+        return min(self._timeout, remaining)
+
+    def _get_finished_pipeline_execution(self, execution_id):
+        """
+        Returns the metadata of a pipeline execution, raising if it has not
+        finished successfully.
+        """
+        pipeline_status = self.get_pipeline_execution(execution_id)
+        _check_finished_successfully(pipeline_status, execution_id)
+        return pipeline_status
+
+    def _get_results_url(self, execution_id, result_format=None):
+        """
+        Returns the signed url from which the results of a finished
+        pipeline execution can be downloaded, asking for them in
+        `result_format` if we can read it.
+        """
+        if result_format is not None:
+            _check_result_format(result_format)
+            from .results import resolve_result_format
+
+            result_format = resolve_result_format(result_format)
+
+        if result_format is not None and result_format != "csv":
+            params = {"format": result_format}
+        else:
+            params = None
+
         response = self._get(
-            '/{execution_id}/exception'.format(execution_id=execution_id),
+            '/{execution_id}/results_url'.format(execution_id=execution_id),
+            params=params,
         )
-
         response.raise_for_status()
+        return response.json()['url']
+
+    def _load_results(self,
+                      execution_id,
+                      compact=False,
+                      result_format=None,
+                      columns=None,
+                      start=None,
+                      end=None,
+                      process_pool=None,
+                      process_parse_threshold=None):
+        """
+        Loads the results of a pipeline execution, from the results cache
+        if possible, and downloads them otherwise.  Complete results are
+        added to the cache once downloaded.
+        """
+        # results are the only part of the client that needs pandas, so we
+        # only import it once they're asked for.
+        from .results import compact_results, select_results
 
-        return response.json()
+        if start is not None:
+            start = normalize_date_input(start)
+        if end is not None:
+            end = normalize_date_input(end)
 
-    def _get(self, path):
-        return self._session.get(
-            self._base_url + path,
+        # results of a finished execution never change, so a cached copy
+        # saves us every round-trip.
+        result_df = None
+        if self._results_cache is not None:
+            result_df = self._results_cache.get(execution_id)
+            self._emit('on_cache', 'results', result_df is not None)
+
+        if result_df is not None:
+            result_df = select_results(result_df, columns, start, end)
+        else:
+            asset_identifier_format, result_df = self._fetch_results(
+                execution_id,
+                result_format,
+                columns,
+                start,
+                end,
+                process_pool,
+                process_parse_threshold,
+            )
+
+            is_complete = columns is None and start is None and end is None
+            if self._results_cache is not None and is_complete:
+                try:
+                    self._results_cache.put(
+                        execution_id,
+                        asset_identifier_format,
+                        result_df,
+                    )
+                except Exception:
+                    # the cache is only an optimization: a full disk or
+                    # results that can't be serialized mustn't cost us the
+                    # results we've just downloaded.
+                    log.warning(
+                        "Could not cache results of pipeline execution %s",
+                        execution_id,
+                        exc_info=True,
+                    )
+
+        if compact:
+            result_df = compact_results(result_df)
+
+        return result_df
+
+    def _fetch_results(self,
+                       execution_id,
+                       result_format=None,
+                       columns=None,
+                       start=None,
+                       end=None,
+                       process_pool=None,
+                       process_parse_threshold=None):
+        """
+        Downloads and parses the results of a pipeline execution, parsing
+        them in `process_pool` if they are at least `process_parse_threshold`
+        bytes large.
+
+        Returns the execution's asset identifier format, and its results.
+        """
+        from .results import infer_schema, read_results_file, schema_key
+
+        pipeline_status = self._get_finished_pipeline_execution(execution_id)
+        asset_identifier_format = pipeline_status["asset_identifier_format"]
+
+        # stream the results to a file and parse them from there, so that
+        # the raw body is never held in memory alongside the frame.  With a
+        # results cache, partial downloads are kept there to be resumed by
+        # a later call.  Each call downloads into a file of its own, so
+        # that concurrent loads of the same results don't interleave.
+        if self._results_cache is not None:
+            results_path = self._results_cache.claim_partial(
+                execution_id,
+                result_format or "csv",
+            )
+        else:
+            fd, results_path = tempfile.mkstemp()
+            os.close(fd)
+
+        try:
+            with self._timed('download'):
+                self._download_results(
+                    execution_id,
+                    result_format,
+                    results_path,
+                )
+        except BaseException:
+            # including KeyboardInterrupt, the usual way a long download
+            # is interrupted.
+            if self._results_cache is not None:
+                self._results_cache.keep_partial(
+                    execution_id,
+                    result_format or "csv",
+                    results_path,
+                )
+            else:
+                os.remove(results_path)
+            raise
+
+        try:
+            if process_pool is not None and \
+                    os.path.getsize(results_path) >= process_parse_threshold:
+                parse = partial(_parse_in_pool, process_pool)
+            else:
+                parse = read_results_file
+
+            # once we've seen the results of a pipeline, we know the dtypes
+            # of its columns and can skip pandas' type inference.
+            key = schema_key(pipeline_status)
+            schema = self._schema_cache.get(key)
+            if key is not None:
+                self._emit('on_cache', 'schema', schema is not None)
+
+            with self._timed('parse'):
+                try:
+                    result_df = parse(
+                        results_path,
+                        asset_identifier_format,
+                        schema,
+                        columns,
+                        start,
+                        end,
+                    )
+                except (TypeError, ValueError):
+                    if schema is None:
+                        raise
+                    # the pipeline's output no longer matches what we
+                    # learned from it, so fall back to inferring dtypes
+                    # again.
+                    schema = None
+                    result_df = parse(
+                        results_path,
+                        asset_identifier_format,
+                        None,
+                        columns,
+                        start,
+                        end,
+                    )
+
+            # learn the dtypes of any columns we hadn't seen before
+            unseen = [
+                column for column in result_df.columns
+                if schema is None or column not in schema
+            ]
+            if unseen:
+                learned = infer_schema(result_df[unseen])
+                result_df = result_df.astype(learned)
+
+                schema = dict(schema or {})
+                schema.update(learned)
+                self._schema_cache.put(key, schema)
+        finally:
+            os.remove(results_path)
+
+        return asset_identifier_format, result_df
+
+    def _iter_results(self,
+                      execution_id,
+                      url,
+                      asset_identifier_format,
+                      chunksize,
+                      compact):
+        import pandas as pd
+
+        from .results import (
+            FLOAT_PRECISION,
+            compact_results,
+            iter_dates,
+            sniff_compression,
         )
 
-    def _post(self, path, body):
-        return self._session.post(
-            self._base_url + path,
-            json=body,
+        with closing(self._download_session.get(
+            url,
+            stream=True,
+            timeout=self._request_timeout(),
+        )) as results_url_resp:
+            if results_url_resp.status_code != 200:
+                raise ResultsDownloadError(
+                    execution_id,
+                    "HTTP {status}".format(
+                        status=results_url_resp.status_code,
+                    ),
+                )
+
+            # let pandas read straight off the socket, decoding any content
+            # encoding as it goes.  The buffering lets us peek at the start
+            # of the body, in case the results were stored compressed.
+            results_url_resp.raw.decode_content = True
+            results_url_resp.raw.auto_close = False
+            results_stream = io.BufferedReader(
+                results_url_resp.raw,
+                RESULTS_CHUNK_SIZE,
+            )
+
+            reader = pd.read_csv(
+                results_stream,
+                index_col=['date', asset_identifier_format],
+                parse_dates=['date'],
+                chunksize=chunksize or RESULTS_ITER_CHUNKSIZE,
+                compression=sniff_compression(results_stream),
+                float_precision=FLOAT_PRECISION,
+            )
+
+            if chunksize is None:
+                reader = iter_dates(reader)
+
+            try:
+                for chunk in reader:
+                    if compact:
+                        chunk = compact_results(chunk)
+                    yield chunk
+            finally:
+                self._emit(
+                    'on_bytes',
+                    'download',
+                    results_url_resp.raw.tell(),
+                )
+
+    def _download_results(self, execution_id, result_format, results_path):
+        """
+        Streams the results of a pipeline execution to `results_path`, one
+        chunk at a time.
+
+        If the file already holds part of the results, only the rest is
+        requested.  Dropped connections are resumed the same way, and an
+        expired results url is replaced with a fresh one, up to
+        `download_retries` times in all.
+
+        Large results are downloaded in `download_parts` concurrent ranges
+        when the server supports it.
+        """
+        url = self._get_results_url(execution_id, result_format)
+
+        if self._download_parts > 1 and not (
+            os.path.exists(results_path) and os.path.getsize(results_path)
+        ):
+            size = self._probe_results_size(url)
+            if size is not None and size >= self._download_part_threshold:
+                try:
+                    self._download_in_parts(
+                        execution_id,
+                        result_format,
+                        url,
+                        results_path,
+                        size,
+                    )
+                    return
+                except BaseException:
+                    # the parts can't be resumed from a single offset
+                    _truncate(results_path)
+                    raise
+
+        intervals = backoff_intervals(
+            DEFAULT_POLL_INTERVAL,
+            DEFAULT_MAX_POLL_INTERVAL,
         )
+        retries = 0
+
+        with open(results_path, 'ab') as results_file:
+            while True:
+                offset = results_file.tell()
+                try:
+                    status = self._download_from_offset(
+                        url,
+                        results_file,
+                        offset,
+                    )
+                except _RESUMABLE_ERRORS as e:
+                    status = None
+                    error = type(e).__name__
+                    reason = "connection error ({exc})".format(exc=e)
+                else:
+                    if status is None:
+                        return
+
+                    reason = "HTTP {status}".format(status=status)
+                    if status not in _EXPIRED_URL_STATUSES:
+                        raise ResultsDownloadError(execution_id, reason)
+
+                if retries >= self._download_retries:
+                    raise ResultsDownloadError(execution_id, reason)
+                retries += 1
+                self._emit(
+                    'on_retry',
+                    'download',
+                    status if status is not None else error,
+                )
+
+                self._sleep_until_next_poll(intervals, None)
+                if status in _EXPIRED_URL_STATUSES:
+                    url = self._get_results_url(execution_id, result_format)
+
+    def _probe_results_size(self, url):
+        """
+        Returns the size in bytes of the body at `url`, or None if the
+        server doesn't support range requests for it.
+
+        Signed urls are only valid for GET, so rather than a HEAD request we
+        ask for the first byte and read the total from the Content-Range.
+        """
+        with closing(self._download_session.get(
+            url,
+            headers={'Range': 'bytes=0-0', 'Accept-Encoding': 'identity'},
+            stream=True,
+            timeout=self._request_timeout(),
+        )) as probe_resp:
+            if probe_resp.status_code != 206:
+                return None
+
+            total = probe_resp.headers.get(
+                'Content-Range', '',
+            ).rpartition('/')[2]
+
+        try:
+            return int(total)
+        except ValueError:
+            return None
+
+    def _download_in_parts(self,
+                           execution_id,
+                           result_format,
+                           url,
+                           results_path,
+                           size):
+        """
+        Downloads the `size` bytes at `url` into `results_path` as
+        `download_parts` byte ranges, each over its own connection and
+        written at its own offset.
+
+        If a part is rejected, perhaps because the url expired, the other
+        parts are stopped, and only the bytes still missing are requested
+        again from a fresh url, up to `download_retries` times.
+        """
+        part_size = -(-size // self._download_parts)
+        # the next byte to write and the last byte of each part, advanced
+        # by `_download_part` as it writes.
+        parts = [
+            [start, min(start + part_size, size) - 1]
+            for start in range(0, size, part_size)
+        ]
+
+        with open(results_path, 'wb') as results_file:
+            results_file.truncate(size)
+
+        retries = 0
+        while True:
+            error = self._download_ranges(
+                execution_id,
+                url,
+                results_path,
+                parts,
+            )
+            if error is None:
+                return
+
+            if not isinstance(error, ResultsDownloadError) or \
+                    retries >= self._download_retries:
+                raise error
+            retries += 1
+            self._emit('on_retry', 'download', error.reason)
+
+            parts = [part for part in parts if part[0] <= part[1]]
+            url = self._get_results_url(execution_id, result_format)
+
+    def _download_ranges(self, execution_id, url, results_path, parts):
+        """
+        Downloads `parts` of the body at `url` concurrently, and returns the
+        first error raised by any of them, after which the others are
+        stopped, or None if they all finished.
+        """
+        stop = threading.Event()
+
+        with ThreadPoolExecutor(len(parts)) as pool:
+            futures = [
+                pool.submit(
+                    self._call_with_bound,
+                    getattr(self._local, 'bound', None),
+                    self._download_part,
+                    execution_id,
+                    url,
+                    results_path,
+                    part,
+                    stop,
+                )
+                for part in parts
+            ]
+
+            error = None
+            try:
+                for future in as_completed(futures):
+                    if future.exception() is not None and error is None:
+                        error = future.exception()
+                        stop.set()
+            except BaseException:
+                # don't wait for the other parts to finish downloading
+                stop.set()
+                raise
+
+        return error
+
+    def _download_part(self, execution_id, url, results_path, part, stop):
+        """
+        Writes the bytes of the body at `url` from ``part[0]`` to
+        ``part[1]`` (inclusive) to the same range of `results_path`,
+        resuming after dropped or short responses up to `download_retries`
+        times.
+
+        ``part[0]`` is advanced as bytes are written.  Returns early, with
+        the part unfinished, once `stop` is set.
+        """
+        start, end = part
+        intervals = backoff_intervals(
+            DEFAULT_POLL_INTERVAL,
+            DEFAULT_MAX_POLL_INTERVAL,
+        )
+        retries = 0
+
+        with open(results_path, 'r+b') as results_file:
+            results_file.seek(start)
+            while start <= end and not stop.is_set():
+                try:
+                    with closing(self._download_session.get(
+                        url,
+                        headers={
+                            'Range': 'bytes={start}-{end}'.format(
+                                start=start,
+                                end=end,
+                            ),
+                            'Accept-Encoding': 'identity',
+                        },
+                        stream=True,
+                        timeout=self._request_timeout(),
+                    )) as part_resp:
+                        if part_resp.status_code != 206:
+                            raise ResultsDownloadError(
+                                execution_id,
+                                "HTTP {status} for bytes {start}-{end}".format(
+                                    status=part_resp.status_code,
+                                    start=start,
+                                    end=end,
+                                ),
+                            )
+
+                        try:
+                            for chunk in part_resp.iter_content(
+                                chunk_size=RESULTS_CHUNK_SIZE,
+                            ):
+                                chunk = chunk[:end - start + 1]
+                                results_file.write(chunk)
+                                start += len(chunk)
+                                part[0] = start
+                                self._remaining()
+                                if stop.is_set():
+                                    return
+                        finally:
+                            self._emit(
+                                'on_bytes',
+                                'download',
+                                part_resp.raw.tell(),
+                            )
+                except _RESUMABLE_ERRORS as e:
+                    if retries >= self._download_retries:
+                        raise
+                    reason = type(e).__name__
+                else:
+                    if start > end:
+                        break
+                    if retries >= self._download_retries:
+                        raise ResultsDownloadError(
+                            execution_id,
+                            "response ended before byte {end}".format(
+                                end=end,
+                            ),
+                        )
+                    reason = "incomplete response"
+
+                retries += 1
+                self._emit('on_retry', 'download', reason)
+                self._sleep_until_next_poll(intervals, None)
+
+    def _download_from_offset(self, url, results_file, offset):
+        """
+        Appends the body at `url`, from byte `offset` onwards, to
+        `results_file`.
+
+        Returns None once the whole body has been written, or the HTTP
+        status of an unsuccessful response.
+        """
+        headers = {}
+        if offset:
+            # ranges refer to the unencoded body, which is what we've
+            # written so far.
+            headers['Range'] = 'bytes={offset}-'.format(offset=offset)
+            headers['Accept-Encoding'] = 'identity'
+
+        with closing(self._download_session.get(
+            url,
+            headers=headers,
+            stream=True,
+            timeout=self._request_timeout(),
+        )) as results_url_resp:
+            status = results_url_resp.status_code
+
+            if status == 416 and offset:
+                # we asked for bytes past the end: either we already have
+                # the whole body, or what we have is stale.
+                total = results_url_resp.headers.get(
+                    'Content-Range', '',
+                ).rpartition('/')[2]
+                if total == str(offset):
+                    return None
+
+                results_file.seek(0)
+                results_file.truncate()
+                return self._download_from_offset(url, results_file, 0)
+
+            if status == 200 and offset:
+                # the server ignored our range, so start over
+                results_file.seek(0)
+                results_file.truncate()
+            elif status not in (200, 206):
+                return status
+
+            try:
+                for chunk in results_url_resp.iter_content(
+                    chunk_size=RESULTS_CHUNK_SIZE,
+                ):
+                    results_file.write(chunk)
+                    self._remaining()
+            finally:
+                # count what came over the wire, before any content
+                # encoding was decoded, as `_iter_results` does.
+                self._emit(
+                    'on_bytes',
+                    'download',
+                    results_url_resp.raw.tell(),
+                )
+
+        return None
+
+    def _get(self, path, params=None):
+        return self._request('GET', path, params=params)
+
+    def _post(self, path, body):
+        return self._request('POST', path, json=body)
+
+    def _request(self, method, path, **kwargs):
+        def send_request():
+            # every attempt counts against the rate limit, retries included
+            if self._rate_limiter is not None:
+                self._acquire_rate_limit()
+
+            return self._session.request(
+                method,
+                self._base_url + path,
+                timeout=self._request_timeout(),
+                **kwargs
+            )
+
+        phase = _request_phase(method, path)
+        bound = getattr(self._local, 'bound', None)
+        try:
+            with self._timed(phase):
+                response = self._retry_policy.send(
+                    send_request,
+                    method,
+                    deadline=None if bound is None else bound[0],
+                    on_retry=partial(self._emit, 'on_retry', phase),
+                )
+        except requests.Timeout:
+            # the request's timeout may have been shortened by the deadline
+            self._remaining()
+            raise
+
+        self._emit('on_bytes', phase, response.raw.tell())
+        return response
+
+    def _acquire_rate_limit(self):
+        """
+        Waits for the rate limiter to allow another request, for no longer
+        than the current call's deadline allows.
+        """
+        remaining = self._remaining()
+        if remaining is None:
+            self._rate_limiter.acquire()
+        elif not self._rate_limiter.acquire(timeout=remaining):
+            raise DeadlineExceeded(self._local.bound[1])
+
+    @contextmanager
+    def _timed(self, phase):
+        start = monotonic()
+        try:
+            yield
+        finally:
+            self._emit('on_phase', phase, monotonic() - start)
+
+    def _emit(self, event, *args):
+        for hook in self._hooks:
+            getattr(hook, event)(*args)
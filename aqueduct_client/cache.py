@@ -0,0 +1,387 @@
+from collections import OrderedDict
+import errno
+import os
+import tempfile
+from threading import Lock
+import time
+
+from .utils import ASSET_IDENTIFIER_FORMATS, FINISHED_STATUSES, monotonic
+
+# Suggested location for the on-disk results cache.
+DEFAULT_CACHE_DIR = "~/.quantopian/cache"
+
+# Default upper bound on the size of the on-disk results cache, in bytes.
+DEFAULT_CACHE_MAX_SIZE = 10 * 1024 ** 3
+
+# Default number of pipeline executions whose metadata is kept in memory.
+DEFAULT_METADATA_CACHE_SIZE = 1024
+
+# Default number of seconds for which the metadata of a running pipeline
+# execution is considered fresh.
+DEFAULT_IN_PROGRESS_TTL = 5.0
+
+# The format in which results are stored, and the formats from which they
+# can be read, once `_storage_formats` has checked for pyarrow.
+_STORAGE_FORMATS = None
+
+_EXTENSIONS = {
+    'parquet': '.parquet',
+    'pickle': '.pkl',
+}
+
+# Number of seconds after which a download into a file of `claim_partial`
+# that hasn't been written to is taken to have been abandoned, for example
+# by a process that was killed, and may be evicted.
+_ABANDONED_DOWNLOAD_AGE = 60 * 60
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+class ResultsCache(object):
+    """
+    An on-disk cache of pipeline results, keyed by execution id and asset
+    identifier format.
+
+    Results are stored as Parquet when pyarrow is installed, and pickled
+    otherwise.  Once the cache grows past `max_size` bytes, the least
+    recently used results, and partial downloads, are evicted.
+
+    Parameters
+    ----------
+    path : str
+        The directory in which to store results.  Created if it does not
+        exist.
+    max_size : int, optional
+        The maximum total size of the cache, in bytes.  Pass None for no
+        limit.
+    """
+    def __init__(self, path, max_size=DEFAULT_CACHE_MAX_SIZE):
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+
+        try:
+            os.makedirs(self.path)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    def get(self, execution_id):
+        """
+        Returns the cached results of a pipeline execution, or None if
+        they are not in the cache.
+        """
+        _, readable_formats = _storage_formats()
+        for asset_identifier_format in ASSET_IDENTIFIER_FORMATS:
+            for storage_format in readable_formats:
+                path = self._entry_path(
+                    execution_id,
+                    asset_identifier_format,
+                    storage_format,
+                )
+                if not os.path.isfile(path):
+                    continue
+
+                try:
+                    result_df = _read(path, storage_format)
+                except Exception:
+                    # a corrupt or truncated entry, which would fail the
+                    # same way every time, so treat it as a miss and remove
+                    # it to be replaced by the next `put`.
+                    _discard(path)
+                    continue
+
+                # mark the entry as recently used
+                try:
+                    os.utime(path, None)
+                except OSError:
+                    pass
+
+                return result_df
+
+        return None
+
+    def put(self, execution_id, asset_identifier_format, result_df):
+        """
+        Stores the results of a pipeline execution, evicting the least
+        recently used entries if the cache has grown too large.
+        """
+        storage_format, _ = _storage_formats()
+        path = self._entry_path(
+            execution_id,
+            asset_identifier_format,
+            storage_format,
+        )
+
+        # write to a temporary file first so that concurrent readers never
+        # see a partially written entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        os.close(fd)
+        try:
+            _write(result_df, tmp_path, storage_format)
+            _replace(tmp_path, path)
+        except Exception:
+            _discard(tmp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries and partial downloads until
+        the cache is no larger than `max_size`.
+
+        Downloads in progress count towards the size of the cache, but are
+        only removed once they have not been written to for an hour.
+        """
+        if self.max_size is None:
+            return
+
+        now = time.time()
+        partial_dir = os.path.join(self.path, 'partial')
+
+        entries = []
+        total_size = 0
+        for directory, extensions in (
+            (self.path, tuple(_EXTENSIONS.values())),
+            (partial_dir, ('.part', '.tmp')),
+        ):
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+
+            for name in names:
+                if not name.endswith(extensions):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                total_size += stat.st_size
+                if name.endswith('.tmp') and \
+                        now - stat.st_mtime < _ABANDONED_DOWNLOAD_AGE:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+
+    def claim_partial(self, execution_id, result_format):
+        """
+        Returns the path of a new file, private to the caller, into which to
+        download the results of a pipeline execution.  If a partial download
+        of them was kept, it is moved there to be resumed.
+
+        Other loaders of the same results, in this process or another, start
+        afresh rather than append to the same file.  Pass the path to
+        `keep_partial` if the download is interrupted, and remove it
+        otherwise.
+        """
+        partial_path = self.partial_path(execution_id, result_format)
+        fd, path = tempfile.mkstemp(
+            dir=os.path.dirname(partial_path),
+            prefix=os.path.basename(partial_path) + '.',
+            suffix='.tmp',
+        )
+        os.close(fd)
+
+        try:
+            _replace(partial_path, path)
+        except OSError:
+            # there is no partial download, or someone else just claimed it
+            pass
+
+        return path
+
+    def keep_partial(self, execution_id, result_format, path):
+        """
+        Keeps the partial download at `path`, from `claim_partial`, to be
+        resumed by a later load of the same results.
+        """
+        if os.path.getsize(path):
+            _replace(path, self.partial_path(execution_id, result_format))
+            self.evict()
+        else:
+            os.remove(path)
+
+    def partial_path(self, execution_id, result_format):
+        """
+        Returns the path at which a partial download of the results of a
+        pipeline execution is kept, so that it can be resumed later.
+        """
+        partial_dir = os.path.join(self.path, 'partial')
+        try:
+            os.makedirs(partial_dir)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        return os.path.join(
+            partial_dir,
+            "{execution_id}.{result_format}.part".format(
+                execution_id=execution_id,
+                result_format=result_format,
+            )
+        )
+
+    def _entry_path(self, execution_id, asset_identifier_format,
+                    storage_format):
+        return os.path.join(
+            self.path,
+            "{execution_id}.{asset_identifier_format}{ext}".format(
+                execution_id=execution_id,
+                asset_identifier_format=asset_identifier_format,
+                ext=_EXTENSIONS[storage_format],
+            )
+        )
+
+
+class ExecutionMetadataCache(object):
+    """
+    An in-memory, least recently used cache of pipeline execution metadata.
+
+    The metadata of finished executions never changes, so it is kept until
+    evicted.  The metadata of executions that are still running expires
+    after `in_progress_ttl` seconds.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        The maximum number of executions to keep.  Pass 0 to disable the
+        cache.
+    in_progress_ttl : float, optional
+        The number of seconds for which the metadata of a running execution
+        is considered fresh.
+    """
+    def __init__(self,
+                 max_entries=DEFAULT_METADATA_CACHE_SIZE,
+                 in_progress_ttl=DEFAULT_IN_PROGRESS_TTL):
+        self.max_entries = max_entries
+        self.in_progress_ttl = in_progress_ttl
+
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, execution_id):
+        """
+        Returns the cached metadata of a pipeline execution, or None if it
+        is not in the cache or has expired.
+        """
+        with self._lock:
+            try:
+                expires_at, pipeline = self._entries.pop(execution_id)
+            except KeyError:
+                return None
+
+            if expires_at is not None and expires_at <= monotonic():
+                return None
+
+            # re-insert to mark the entry as recently used
+            self._entries[execution_id] = (expires_at, pipeline)
+
+        return dict(pipeline)
+
+    def put(self, pipeline):
+        """
+        Stores the metadata of a pipeline execution.
+        """
+        if self.max_entries <= 0:
+            return
+
+        if pipeline['status'] in FINISHED_STATUSES:
+            expires_at = None
+        else:
+            expires_at = monotonic() + self.in_progress_ttl
+
+        with self._lock:
+            self._entries.pop(pipeline['id'], None)
+            self._entries[pipeline['id']] = (expires_at, dict(pipeline))
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class SchemaCache(object):
+    """
+    An in-memory cache of the column dtypes of pipeline results, keyed by
+    `aqueduct_client.results.schema_key`.
+    """
+    def __init__(self):
+        self._schemas = {}
+        self._lock = Lock()
+
+    def get(self, key):
+        """
+        Returns the cached dtypes for `key`, or None if there are none.
+        """
+        if key is None:
+            return None
+
+        with self._lock:
+            return self._schemas.get(key)
+
+    def put(self, key, schema):
+        """
+        Stores the dtypes for `key`.
+        """
+        if key is None:
+            return
+
+        with self._lock:
+            self._schemas[key] = schema
+
+
+def _storage_formats():
+    """
+    Returns the format in which results are stored, and the formats from
+    which they can be read: Parquet if pyarrow is installed, and pickle
+    otherwise.  Checked on first use, as importing pyarrow is slow.
+    """
+    global _STORAGE_FORMATS
+
+    if _STORAGE_FORMATS is None:
+        try:
+            import pyarrow  # noqa
+        except ImportError:
+            _STORAGE_FORMATS = ('pickle', ('pickle',))
+        else:
+            _STORAGE_FORMATS = ('parquet', ('parquet', 'pickle'))
+
+    return _STORAGE_FORMATS
+
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _read(path, storage_format):
+    import pandas as pd
+
+    if storage_format == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _write(result_df, path, storage_format):
+    if storage_format == 'parquet':
+        result_df.to_parquet(path)
+    else:
+        result_df.to_pickle(path)
@@ -21,3 +21,71 @@ class ConcurrentExecutionsExceeded(Exception):
                 current=self.current,
                 maximum=self.maximum,
             )
+
+
+class PipelineExecutionTimeout(Exception):
+    """
+    Indicates that pipeline executions did not finish within the time
+    the caller was willing to wait for them.
+
+    Attributes
+    ----------
+    execution_ids: list of str
+        The ids of the pipeline executions that were still running.
+
+    timeout: float
+        The number of seconds that we waited.
+    """
+    def __init__(self, execution_ids, timeout):
+        self.execution_ids = execution_ids
+        self.timeout = timeout
+
+    def __str__(self):
+        return "Pipeline executions {execution_ids} did not finish within " \
+            "{timeout} seconds.".format(
+                execution_ids=", ".join(self.execution_ids),
+                timeout=self.timeout,
+            )
+
+
+class ResultsDownloadError(ValueError):
+    """
+    Indicates that the results of a pipeline execution could not be
+    downloaded from the url the API gave us for them.
+
+    Attributes
+    ----------
+    execution_id: str
+        The id of the pipeline execution whose results we tried to load.
+
+    reason: str
+        What went wrong, such as the HTTP status of the last attempt.
+    """
+    def __init__(self, execution_id, reason):
+        self.execution_id = execution_id
+        self.reason = reason
+
+    def __str__(self):
+        return "Could not download results of pipeline execution " \
+            "{execution_id}: {reason}".format(
+                execution_id=self.execution_id,
+                reason=self.reason,
+            )
+
+
+class DeadlineExceeded(Exception):
+    """
+    Indicates that a call to the client did not finish within its
+    `deadline`.
+
+    Attributes
+    ----------
+    deadline: float
+        The number of seconds the call was given.
+    """
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    def __str__(self):
+        return "Call did not finish within its deadline of {deadline} " \
+            "seconds.".format(deadline=self.deadline)
@@ -0,0 +1,262 @@
+"""
+Hooks for observing where AqueductClient spends its time.
+
+A client reports four kinds of events to its hooks:
+
+on_phase(phase, seconds)
+    A phase of work finished, successfully or not.  The phases are the API
+    calls ("executions", "status", "quota", "submit", "results_url" and
+    "exception", each including its retries), and the "download" and
+    "parse" of results.
+
+on_bytes(phase, nbytes)
+    `nbytes` were received during `phase`, counted as sent over the wire,
+    before any content encoding was decoded.
+
+on_retry(phase, reason)
+    A request made during `phase` is being retried after `reason`, either
+    an HTTP status or the name of an exception.
+
+on_cache(cache, hit)
+    The "results", "metadata" or "schema" cache was looked up.
+
+Every client keeps a `ClientStats`, available from `AqueductClient.stats`.
+Further hooks, such as `StatsDHooks` or `OpenTelemetryHooks`, can be passed
+to `create_client` with ``hooks=[...]``.
+"""
+from bisect import bisect_left
+from threading import Lock
+
+# Upper bounds, in seconds, of the buckets of the latency histograms.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, float('inf'),
+)
+
+
+class ClientHooks(object):
+    """
+    Base class for client hooks, which ignores every event.  Subclasses
+    override the events they are interested in.
+    """
+    def on_phase(self, phase, seconds):
+        pass
+
+    def on_bytes(self, phase, nbytes):
+        pass
+
+    def on_retry(self, phase, reason):
+        pass
+
+    def on_cache(self, cache, hit):
+        pass
+
+
+class ClientStats(ClientHooks):
+    """
+    Accumulates a client's events into latency histograms and counters.
+
+    Safe to share between threads.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets all the events recorded so far.
+        """
+        with self._lock:
+            self._phases = {}
+            self._bytes = {}
+            self._retries = {}
+            self._cache = {}
+
+    def on_phase(self, phase, seconds):
+        with self._lock:
+            try:
+                latency = self._phases[phase]
+            except KeyError:
+                latency = self._phases[phase] = _Histogram()
+            latency.add(seconds)
+
+    def on_bytes(self, phase, nbytes):
+        with self._lock:
+            self._bytes[phase] = self._bytes.get(phase, 0) + nbytes
+
+    def on_retry(self, phase, reason):
+        with self._lock:
+            self._retries[phase] = self._retries.get(phase, 0) + 1
+
+    def on_cache(self, cache, hit):
+        with self._lock:
+            hits, misses = self._cache.get(cache, (0, 0))
+            self._cache[cache] = (hits + hit, misses + (not hit))
+
+    def snapshot(self):
+        """
+        Returns the statistics recorded so far.
+
+        Returns
+        -------
+        dict
+            A dictionary with the following keys:
+            phases: dict
+                For each phase, the number of times it ran (count), their
+                total and longest duration in seconds (total, max), upper
+                bounds on their median and 99th percentile duration (p50,
+                p99), and a histogram of durations as a list of (upper
+                bound, count) pairs.
+            bytes: dict
+                The number of bytes received during each phase.
+            retries: dict
+                The number of retries made during each phase.
+            cache: dict
+                For each cache, its number of hits and misses, and the
+                fraction of lookups that were hits (hit_rate).
+        """
+        with self._lock:
+            return {
+                "phases": {
+                    phase: latency.summary()
+                    for phase, latency in self._phases.items()
+                },
+                "bytes": dict(self._bytes),
+                "retries": dict(self._retries),
+                "cache": {
+                    cache: {
+                        "hits": hits,
+                        "misses": misses,
+                        "hit_rate": float(hits) / (hits + misses),
+                    }
+                    for cache, (hits, misses) in self._cache.items()
+                },
+            }
+
+
+class StatsDHooks(ClientHooks):
+    """
+    Reports a client's events to StatsD.
+
+    Parameters
+    ----------
+    client : object
+        A StatsD client with ``timing(name, milliseconds)`` and
+        ``incr(name, count)`` methods, such as ``statsd.StatsClient``.
+    prefix : str, optional
+        The prefix of every metric name.
+    """
+    def __init__(self, client, prefix="aqueduct_client"):
+        self.client = client
+        self.prefix = prefix
+
+    def on_phase(self, phase, seconds):
+        self.client.timing(self._name(phase), seconds * 1000.0)
+
+    def on_bytes(self, phase, nbytes):
+        self.client.incr(self._name(phase, "bytes"), nbytes)
+
+    def on_retry(self, phase, reason):
+        self.client.incr(self._name(phase, "retries"), 1)
+
+    def on_cache(self, cache, hit):
+        self.client.incr(
+            self._name("cache", cache, "hits" if hit else "misses"),
+            1,
+        )
+
+    def _name(self, *parts):
+        return ".".join((self.prefix,) + parts)
+
+
+class OpenTelemetryHooks(ClientHooks):
+    """
+    Reports a client's events as OpenTelemetry metrics.
+
+    Durations are recorded in a ``<prefix>.duration`` histogram, and bytes,
+    retries and cache lookups in ``<prefix>.bytes``, ``<prefix>.retries``
+    and ``<prefix>.cache.lookups`` counters, with the phase or cache as an
+    attribute.
+
+    Parameters
+    ----------
+    meter : opentelemetry.metrics.Meter
+        The meter with which to create the instruments, for example
+        ``opentelemetry.metrics.get_meter("aqueduct_client")``.
+    prefix : str, optional
+        The prefix of every instrument name.
+    """
+    def __init__(self, meter, prefix="aqueduct_client"):
+        self._duration = meter.create_histogram(
+            prefix + ".duration",
+            unit="s",
+            description="Duration of client phases.",
+        )
+        self._bytes = meter.create_counter(
+            prefix + ".bytes",
+            unit="By",
+            description="Bytes received by the client.",
+        )
+        self._retries = meter.create_counter(
+            prefix + ".retries",
+            description="Requests retried by the client.",
+        )
+        self._cache = meter.create_counter(
+            prefix + ".cache.lookups",
+            description="Cache lookups made by the client.",
+        )
+
+    def on_phase(self, phase, seconds):
+        self._duration.record(seconds, {"phase": phase})
+
+    def on_bytes(self, phase, nbytes):
+        self._bytes.add(nbytes, {"phase": phase})
+
+    def on_retry(self, phase, reason):
+        self._retries.add(1, {"phase": phase, "reason": str(reason)})
+
+    def on_cache(self, cache, hit):
+        self._cache.add(1, {"cache": cache, "hit": bool(hit)})
+
+
+class _Histogram(object):
+    """
+    Counts of durations in the buckets of `LATENCY_BUCKETS`.
+    """
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """
+        Returns an upper bound on the `q` quantile of the durations.
+        """
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "histogram": [
+                (bound, count)
+                for bound, count in zip(LATENCY_BUCKETS, self.counts)
+                if count
+            ],
+        }
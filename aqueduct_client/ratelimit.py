@@ -0,0 +1,180 @@
+from contextlib import contextmanager
+import os
+from threading import Lock
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # windows
+    fcntl = None
+    import msvcrt
+
+from .utils import monotonic
+
+
+class TokenBucket(object):
+    """
+    Limits the rate of requests made by the threads of a process.
+
+    The bucket holds up to `burst` tokens and is refilled at `rate` tokens
+    per second.  Each request takes a token, waiting for one if the bucket
+    is empty, so requests are spread out at `rate` per second after an
+    initial burst.
+
+    Parameters
+    ----------
+    rate : float
+        The sustained number of requests per second.
+    burst : int, optional
+        The number of requests that can be made at once.  Defaults to 1,
+        which evenly spaces all requests.
+    """
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError(
+                "rate must be positive, got {rate}".format(rate=rate)
+            )
+
+        self.rate = float(rate)
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._updated_at = monotonic()
+        self._lock = Lock()
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Takes `tokens` tokens from the bucket, blocking until they are
+        available.
+
+        Returns True once they are taken, or False, without taking them, if
+        they won't be available within `timeout` seconds.
+        """
+        expires_at = None if timeout is None else monotonic() + timeout
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens, wait = _take(
+                    self._tokens,
+                    now - self._updated_at,
+                    tokens,
+                    self.rate,
+                    self.burst,
+                )
+                self._updated_at = now
+
+            if not wait:
+                return True
+            if not _can_wait(wait, expires_at):
+                return False
+            time.sleep(wait)
+
+
+class FileTokenBucket(object):
+    """
+    Limits the rate of requests made by all the processes on a machine that
+    share a lock file, such as workers sharing one API key.
+
+    Behaves like `TokenBucket`, but keeps the bucket in `path`, which is
+    locked while it is read and updated.
+
+    Parameters
+    ----------
+    path : str
+        The file in which to keep the bucket.  Created if it does not
+        exist.
+    rate : float
+        The sustained number of requests per second, across all processes.
+    burst : int, optional
+        The number of requests that can be made at once.
+    """
+    def __init__(self, path, rate, burst=1):
+        if rate <= 0:
+            raise ValueError(
+                "rate must be positive, got {rate}".format(rate=rate)
+            )
+
+        self.path = os.path.expanduser(path)
+        self.rate = float(rate)
+        self.burst = burst
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Takes `tokens` tokens from the bucket, blocking until they are
+        available.
+
+        Returns True once they are taken, or False, without taking them, if
+        they won't be available within `timeout` seconds.
+        """
+        expires_at = None if timeout is None else monotonic() + timeout
+        while True:
+            with self._locked() as fd:
+                # wall clock time, as monotonic clocks aren't comparable
+                # between processes.
+                now = time.time()
+                state = os.read(fd, 64).split()
+                if len(state) == 2:
+                    available, updated_at = map(float, state)
+                    elapsed = max(now - updated_at, 0.0)
+                else:
+                    available, elapsed = float(self.burst), 0.0
+
+                available, wait = _take(
+                    available,
+                    elapsed,
+                    tokens,
+                    self.rate,
+                    self.burst,
+                )
+
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, "{!r} {!r}".format(available, now).encode())
+
+            if not wait:
+                return True
+            if not _can_wait(wait, expires_at):
+                return False
+            time.sleep(wait)
+
+    @contextmanager
+    def _locked(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            try:
+                yield fd
+            finally:
+                os.lseek(fd, 0, os.SEEK_SET)
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+
+def _can_wait(wait, expires_at):
+    """
+    Returns whether waiting `wait` seconds would end before `expires_at`.
+    """
+    return expires_at is None or monotonic() + wait <= expires_at
+
+
+def _take(available, elapsed, tokens, rate, burst):
+    """
+    Refills a bucket holding `available` tokens for `elapsed` seconds, and
+    takes `tokens` from it if it can.
+
+    Returns the tokens left in the bucket, and 0 if they were taken or else
+    the number of seconds to wait before trying again.
+    """
+    available = min(available + elapsed * rate, burst)
+    if available >= tokens:
+        return available - tokens, 0
+
+    return available, (tokens - available) / rate
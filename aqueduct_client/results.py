@@ -0,0 +1,478 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_float_dtype,
+    is_numeric_dtype,
+    is_string_dtype,
+)
+
+try:
+    import pyarrow  # noqa
+except ImportError:
+    _HAVE_PYARROW = False
+else:
+    _HAVE_PYARROW = True
+
+# Leading bytes of the compressed file formats that pandas can read, for
+# results that were stored compressed rather than compressed in transit.
+_MAGIC_NUMBERS = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+    (b'PK\x03\x04', 'zip'),
+)
+
+# Leading bytes of the columnar formats in which results may be served.
+_COLUMNAR_MAGIC_NUMBERS = (
+    (b'PAR1', 'parquet'),
+    (b'ARROW1', 'arrow'),
+    # arrow ipc streams start with a continuation marker
+    (b'\xff\xff\xff\xff', 'arrow_stream'),
+)
+
+# Number of csv rows read at a time when loading a date range of results.
+_WINDOW_CHUNKSIZE = 250000
+
+# Float parser of pandas' C csv engine.  Its default parser can be off by
+# one unit in the last place, so that the same results would load slightly
+# differently than through the pyarrow engine, which parses floats exactly.
+FLOAT_PRECISION = 'round_trip'
+
+# `date_format` was added to read_csv in pandas 2.0.
+_SUPPORTS_DATE_FORMAT = int(pd.__version__.split('.')[0]) >= 2
+
+
+def resolve_result_format(result_format):
+    """
+    Utility method that returns the format in which results should be
+    requested: `result_format` if we are able to read it, and csv
+    otherwise.
+    """
+    if result_format != 'csv' and not _HAVE_PYARROW:
+        return 'csv'
+    return result_format
+
+
+def read_results_file(path,
+                      asset_identifier_format,
+                      dtype=None,
+                      columns=None,
+                      start=None,
+                      end=None):
+    """
+    Parses pipeline results from a file in any of the formats in which
+    they may be served: Parquet, Arrow IPC, or (possibly compressed) csv.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file to parse.
+    asset_identifier_format : str
+        The asset identifier format that the pipeline used.
+    dtype : dict, optional
+        The dtypes of the result's columns, as returned by `infer_schema`.
+    columns : list of str, optional
+        The columns to load.  If not given, all columns are loaded.
+    start : datetime.date, optional
+        The first date to load.
+    end : datetime.date, optional
+        The last date to load.
+
+    Returns
+    -------
+    pd.DataFrame
+        A dataframe holding the result, indexed by date and the asset
+        identifier.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(8)
+
+    for magic_number, result_format in _COLUMNAR_MAGIC_NUMBERS:
+        if header.startswith(magic_number):
+            break
+    else:
+        return read_results_csv(
+            path,
+            asset_identifier_format,
+            dtype,
+            columns,
+            start,
+            end,
+        )
+
+    import pyarrow as pa
+
+    index_col = ['date', asset_identifier_format]
+    if columns is not None:
+        usecols = index_col + list(columns)
+    else:
+        usecols = None
+
+    # memory map the file, so that arrow can hand its buffers to pandas
+    # without copying them.
+    if result_format == 'parquet':
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, columns=usecols, memory_map=True)
+    else:
+        source = pa.memory_map(path)
+        if result_format == 'arrow':
+            table = pa.ipc.open_file(source).read_all()
+        else:
+            table = pa.ipc.open_stream(source).read_all()
+        if usecols is not None:
+            table = table.select(usecols)
+
+    result_df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+
+    if list(result_df.index.names) != index_col:
+        result_df = result_df.reset_index(drop=result_df.index.names == [None])
+        result_df['date'] = pd.to_datetime(result_df['date'])
+        result_df = result_df.set_index(index_col)
+
+    result_df = select_results(result_df, start=start, end=end)
+
+    if dtype is not None:
+        result_df = result_df.astype(_restrict(dtype, result_df.columns))
+
+    return result_df
+
+
+def read_results_csv(filepath_or_buffer,
+                     asset_identifier_format,
+                     dtype=None,
+                     columns=None,
+                     start=None,
+                     end=None):
+    """
+    Parses pipeline results from csv.
+
+    Parameters
+    ----------
+    filepath_or_buffer : str or file-like
+        The csv to parse.
+    asset_identifier_format : str
+        The asset identifier format that the pipeline used.
+    dtype : dict, optional
+        The dtypes of the result's columns, as returned by `infer_schema`.
+        When given, pandas' type inference is skipped, dates are parsed as
+        ISO 8601, and the pyarrow csv engine is used if it is installed.
+    columns : list of str, optional
+        The columns to parse.  If not given, all columns are parsed.
+    start : datetime.date, optional
+        The first date to load.  Rows before it are dropped as the csv
+        is read.
+    end : datetime.date, optional
+        The last date to load.  Reading stops once it has been passed.
+
+    Returns
+    -------
+    pd.DataFrame
+        A dataframe holding the result, indexed by date and the asset
+        identifier.
+    """
+    index_col = ['date', asset_identifier_format]
+
+    kwargs = {
+        'index_col': index_col,
+        'parse_dates': ['date'],
+        'compression': sniff_compression(filepath_or_buffer),
+        'float_precision': FLOAT_PRECISION,
+    }
+
+    if columns is not None:
+        kwargs['usecols'] = index_col + list(columns)
+        if dtype is not None:
+            dtype = _restrict(dtype, columns)
+
+    if dtype is not None:
+        kwargs['dtype'] = dtype
+        if _SUPPORTS_DATE_FORMAT:
+            kwargs['date_format'] = 'ISO8601'
+
+    if start is not None or end is not None:
+        return _read_csv_window(filepath_or_buffer, start, end, kwargs)
+
+    if dtype is not None and _HAVE_PYARROW:
+        # pyarrow parses booleans natively, but casts any string to True
+        # when asked for a bool column, so we let it infer those.  It also
+        # mishandles named index columns combined with dtypes, so we set
+        # the index ourselves.
+        del kwargs['index_col']
+        del kwargs['float_precision']
+        kwargs['dtype'] = {
+            column: column_dtype
+            for column, column_dtype in dtype.items()
+            if column_dtype != 'bool'
+        }
+        return pd.read_csv(
+            filepath_or_buffer,
+            engine='pyarrow',
+            **kwargs
+        ).set_index(index_col)
+
+    return pd.read_csv(filepath_or_buffer, **kwargs)
+
+
+def select_results(result_df, columns=None, start=None, end=None):
+    """
+    Utility method that narrows pipeline results down to some of their
+    columns and an inclusive date range.
+
+    Parameters
+    ----------
+    result_df : pd.DataFrame
+        Results indexed by date and asset.
+    columns : list of str, optional
+        The columns to keep.  If not given, all columns are kept.
+    start : date-like, optional
+        The first date to keep.
+    end : date-like, optional
+        The last date to keep.
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected results.
+    """
+    if columns is not None:
+        result_df = result_df[list(columns)]
+
+    if start is not None or end is not None:
+        dates = result_df.index.get_level_values('date')
+        result_df = result_df[_in_date_range(dates, start, end)]
+
+    return result_df
+
+
+def _read_csv_window(filepath_or_buffer, start, end, read_csv_kwargs):
+    """
+    Reads the rows of a date-sorted results csv that fall between `start`
+    and `end`, one chunk at a time, so that rows outside of the range are
+    never all held in memory.
+    """
+    reader = pd.read_csv(
+        filepath_or_buffer,
+        chunksize=_WINDOW_CHUNKSIZE,
+        **read_csv_kwargs
+    )
+
+    chunks = []
+    try:
+        for chunk in reader:
+            dates = chunk.index.get_level_values('date')
+            chunks.append(chunk[_in_date_range(dates, start, end)])
+
+            # results are sorted by date, so once we've passed the end of
+            # the range there is nothing left to read.
+            if end is not None and len(dates) and \
+                    dates[-1] >= _date_bound(end, dates, inclusive=True):
+                break
+    finally:
+        reader.close()
+
+    result_df = pd.concat(chunks)
+
+    # chunks may disagree on the categories of categorical columns, in
+    # which case concatenating them loses the categorical dtype.
+    if 'dtype' in read_csv_kwargs:
+        result_df = result_df.astype(
+            _restrict(read_csv_kwargs['dtype'], result_df.columns),
+        )
+
+    return result_df
+
+
+def _in_date_range(dates, start, end):
+    """
+    Returns a boolean mask of the `dates` that fall between `start` and
+    `end`, inclusive.
+    """
+    mask = np.ones(len(dates), dtype=bool)
+
+    if start is not None:
+        mask &= dates >= _date_bound(start, dates)
+    if end is not None:
+        mask &= dates < _date_bound(end, dates, inclusive=True)
+
+    return mask
+
+
+def _date_bound(date, dates, inclusive=False):
+    """
+    Returns `date` as a timestamp comparable with `dates`.  If `inclusive`,
+    returns the start of the following day instead.
+    """
+    bound = pd.Timestamp(date)
+    # results with no rows have no dates to parse, and so no timezone
+    if getattr(dates, 'tz', None) is not None:
+        bound = bound.tz_localize(dates.tz)
+    if inclusive:
+        bound += pd.Timedelta(days=1)
+    return bound
+
+
+def _restrict(dtype, columns):
+    """
+    Returns the entries of `dtype` for the given columns.
+    """
+    return {
+        column: column_dtype
+        for column, column_dtype in dtype.items()
+        if column in columns
+    }
+
+
+def sniff_compression(filepath_or_buffer):
+    """
+    Utility method that detects whether a file is compressed, from its
+    first few bytes.
+
+    Parameters
+    ----------
+    filepath_or_buffer : str or file-like
+        The path of the file, or a binary file object.  File objects must
+        either be seekable or support `peek`, and are left at their
+        current position.
+
+    Returns
+    -------
+    str or None
+        The name of the compression, as understood by the `compression`
+        argument of `pd.read_csv`, or None if the file is not compressed.
+    """
+    if isinstance(filepath_or_buffer, str):
+        with open(filepath_or_buffer, 'rb') as f:
+            header = f.read(8)
+    elif hasattr(filepath_or_buffer, 'peek'):
+        header = filepath_or_buffer.peek(8)[:8]
+    else:
+        position = filepath_or_buffer.tell()
+        header = filepath_or_buffer.read(8)
+        filepath_or_buffer.seek(position)
+
+    for magic_number, compression in _MAGIC_NUMBERS:
+        if header.startswith(magic_number):
+            return compression
+
+    return None
+
+
+def infer_schema(result_df):
+    """
+    Utility method that picks the dtypes with which later results of the
+    same pipeline should be parsed.
+
+    String, categorical, numeric and boolean columns keep the dtypes pandas
+    inferred for them, so that later loads return the same frame as the
+    first without inferring them again.  Any other columns are left out,
+    to be inferred on every load.
+
+    Returns
+    -------
+    dict[str, str]
+        The dtype of each column of `result_df`.
+    """
+    schema = {}
+    for column in result_df.columns:
+        values = result_df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            schema[column] = 'category'
+        elif is_string_dtype(values) or is_bool_dtype(values) or \
+                is_numeric_dtype(values):
+            schema[column] = str(values.dtype)
+
+    return schema
+
+
+def compact_results(result_df):
+    """
+    Utility method that shrinks pipeline results in place.
+
+    Float columns are stored as float32 unless their values would overflow
+    it, and string columns are stored as categoricals.  The asset level of
+    the index needs no such treatment, as a MultiIndex already stores each
+    distinct identifier only once.
+
+    Returns
+    -------
+    pd.DataFrame
+        `result_df`, with its columns compacted.
+    """
+    float32_max = np.finfo(np.float32).max
+
+    for column in result_df.columns:
+        values = result_df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            continue
+
+        if is_float_dtype(values) and values.dtype.itemsize > 4:
+            finite = values[np.isfinite(values)]
+            if not len(finite) or np.abs(finite).max() <= float32_max:
+                result_df[column] = values.astype(np.float32)
+        elif is_string_dtype(values):
+            result_df[column] = values.astype('category')
+
+    return result_df
+
+
+def schema_key(pipeline_status):
+    """
+    Utility method that returns a key identifying the columns that a
+    pipeline execution produces, based on its code and parameters, or None
+    if its metadata does not include its code.
+    """
+    code = pipeline_status.get("code")
+    if code is None:
+        return None
+
+    key = json.dumps(
+        [code, pipeline_status.get("params")],
+        sort_keys=True,
+    )
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def iter_dates(chunks):
+    """
+    Utility method that regroups an iterator of date-sorted result chunks
+    into one dataframe per date.
+
+    Parameters
+    ----------
+    chunks : iterator[pd.DataFrame]
+        Result chunks indexed by date and asset, in date order, such as
+        the reader returned by `pd.read_csv(..., chunksize=...)`.
+
+    Returns
+    -------
+    iterator[pd.DataFrame]
+        One dataframe per date, each still indexed by date and asset.
+    """
+    pending = None
+    for chunk in chunks:
+        if not len(chunk):
+            # results with no rows at all are read as one empty chunk
+            continue
+
+        if pending is not None:
+            chunk = pd.concat([pending, chunk])
+
+        # the last date in a chunk may continue into the next one, so hold
+        # it back until we've seen where it ends.
+        dates = chunk.index.get_level_values('date')
+        is_last_date = dates == dates[-1]
+
+        complete = chunk[~is_last_date]
+        pending = chunk[is_last_date]
+
+        for _, frame in complete.groupby(level='date', sort=False):
+            yield frame
+
+    if pending is not None and len(pending):
+        yield pending
@@ -0,0 +1,193 @@
+from email.utils import mktime_tz, parsedate_tz
+from threading import Lock
+import time
+
+import requests
+
+from .utils import backoff_intervals, monotonic
+
+# Default number of times a request to the API is retried.
+DEFAULT_MAX_RETRIES = 3
+
+# Default bounds, in seconds, on the interval between retries.
+DEFAULT_RETRY_INTERVAL = 0.5
+DEFAULT_MAX_RETRY_INTERVAL = 30.0
+
+# Responses with these statuses are worth trying again.
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods that can be repeated without changing the result.
+DEFAULT_RETRY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Errors raised before a response arrives that are worth trying again.
+_RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+)
+
+
+class RetryBudget(object):
+    """
+    Limits retries to a fraction of the requests being made, so that a
+    failing API is not hammered by every caller retrying at once.
+
+    Each request deposits `ratio` retries into the budget, up to
+    `max_retries`, and each retry withdraws one.  The budget starts full.
+
+    Parameters
+    ----------
+    ratio : float, optional
+        The number of retries earned by each request.
+    max_retries : int, optional
+        The most retries that can be saved up, and the number that can be
+        made before any requests have succeeded.
+    """
+    def __init__(self, ratio=0.2, max_retries=10):
+        self.ratio = ratio
+        self.max_retries = max_retries
+
+        self._balance = float(max_retries)
+        self._lock = Lock()
+
+    def deposit(self):
+        """
+        Records that a request was made.
+        """
+        with self._lock:
+            self._balance = min(self._balance + self.ratio, self.max_retries)
+
+    def withdraw(self):
+        """
+        Returns whether a retry may be made, recording it if so.
+        """
+        with self._lock:
+            if self._balance < 1:
+                return False
+
+            self._balance -= 1
+            return True
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed requests to the API are tried again, and when.
+
+    Only idempotent methods are retried by default, after connection errors
+    and responses whose status is in `statuses`.  Retries are spaced by
+    jittered exponential backoff, or by the server's Retry-After header
+    when it sends one.
+
+    Parameters
+    ----------
+    max_retries : int, optional
+        The number of times a request is retried.  Pass 0 to never retry.
+    interval : float, optional
+        The number of seconds before the first retry.
+    max_interval : float, optional
+        The most seconds to wait between retries.  A Retry-After longer
+        than this is not waited for; the response is returned instead.
+    statuses : iterable[int], optional
+        The response statuses after which a request is retried.
+    methods : iterable[str], optional
+        The HTTP methods that may be retried.
+    budget : RetryBudget, optional
+        Shared limit on the number of retries.  If not given, each policy
+        has its own.
+    """
+    def __init__(self,
+                 max_retries=DEFAULT_MAX_RETRIES,
+                 interval=DEFAULT_RETRY_INTERVAL,
+                 max_interval=DEFAULT_MAX_RETRY_INTERVAL,
+                 statuses=DEFAULT_RETRY_STATUSES,
+                 methods=DEFAULT_RETRY_METHODS,
+                 budget=None):
+        self.max_retries = max_retries
+        self.interval = interval
+        self.max_interval = max_interval
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.budget = budget if budget is not None else RetryBudget()
+
+    def send(self, send_request, method, deadline=None, on_retry=None):
+        """
+        Calls `send_request` until it returns a response that shouldn't be
+        retried, and returns that response.
+
+        Errors that shouldn't be retried, or that persist after the last
+        retry, are raised.  No retry is made that would start after
+        `deadline`, a `monotonic` time.  Before each retry, `on_retry` is
+        called with the status or name of the error that caused it.
+        """
+        intervals = backoff_intervals(self.interval, self.max_interval)
+        retryable = method.upper() in self.methods
+        attempt = 0
+
+        while True:
+            self.budget.deposit()
+            try:
+                response = send_request()
+            except _RETRYABLE_ERRORS as e:
+                delay = next(intervals)
+                if not (
+                    retryable and
+                    _before(deadline, delay) and
+                    self._may_retry(attempt)
+                ):
+                    raise
+                reason = type(e).__name__
+            else:
+                if not (
+                    retryable and response.status_code in self.statuses
+                ):
+                    return response
+
+                retry_after = _parse_retry_after(
+                    response.headers.get('Retry-After'),
+                )
+                if retry_after is not None and retry_after > self.max_interval:
+                    return response
+
+                delay = next(intervals)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+
+                if not (
+                    _before(deadline, delay) and self._may_retry(attempt)
+                ):
+                    return response
+
+                response.close()
+                reason = response.status_code
+
+            if on_retry is not None:
+                on_retry(reason)
+
+            attempt += 1
+            time.sleep(delay)
+
+    def _may_retry(self, attempt):
+        return attempt < self.max_retries and self.budget.withdraw()
+
+
+def _before(deadline, delay):
+    return deadline is None or monotonic() + delay < deadline
+
+
+def _parse_retry_after(value):
+    """
+    Returns the number of seconds to wait given by a Retry-After header,
+    which is either a number of seconds or an HTTP date, or None.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+
+    return max(mktime_tz(parsed) - time.time(), 0.0)
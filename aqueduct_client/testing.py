@@ -0,0 +1,610 @@
+"""
+An in-process fake of the Aqueduct API, for developing and load testing
+code that uses the client without touching the real service.
+
+Requires Python 3.7+.
+
+.. code-block:: python
+
+    from aqueduct_client import create_client
+    from aqueduct_client.testing import FakeAqueductServer
+
+    with FakeAqueductServer(maximum=5, run_time=2.0) as server:
+        client = create_client(api_key='test', base_url=server.base_url)
+        execution_id = client.submit_pipeline_execution(
+            code, '2019-01-01', '2019-12-31',
+        )
+        results = client.wait_for_execution(execution_id, fetch_results=True)
+"""
+import gzip
+import heapq
+import itertools
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    from urllib.parse import parse_qs, urlencode
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:
+    raise ImportError("aqueduct_client.testing requires Python 3.7+.")
+
+from .utils import ASSET_IDENTIFIER_FORMATS, RESULT_FORMATS
+
+# Number of assets in each date of synthetic results.
+ASSETS_PER_DATE = 2000
+
+# Size of the chunks in which results files are written and served.
+_CHUNK_SIZE = 1024 * 1024
+
+_CONTENT_TYPES = {
+    '.gz': 'application/gzip',
+    '.parquet': 'application/vnd.apache.parquet',
+    '.arrow': 'application/vnd.apache.arrow.file',
+}
+
+
+class FakeAqueductServer(object):
+    """
+    Serves a fake of the Aqueduct API, and of the storage behind its results
+    urls, from a thread of this process.
+
+    Submitted executions wait in a queue for one of `workers` slots, run for
+    `run_time` seconds, and then succeed or, with probability `error_rate`,
+    fail.  At most `maximum` executions may be queued or running at once;
+    further submissions are refused with a 429, as the real API does.
+    Executions only change state when they are looked at, so the server can
+    hold many thousands of them.
+
+    Parameters
+    ----------
+    maximum : int, optional
+        The concurrent execution quota.
+    workers : int, optional
+        The number of executions that run at once.  Defaults to `maximum`,
+        so that executions never wait in the queue.
+    run_time : float or callable, optional
+        The number of seconds for which each execution runs, or a function
+        from the submitted body to that number.
+    error_rate : float, optional
+        The fraction of executions that end in error.
+    results_size : int, optional
+        The approximate size, in bytes, of each execution's csv results.
+        Results are served in the format the execution was submitted with,
+        or the format asked for by the results url request, converted from
+        csv the first time they are downloaded.
+    latency : float, optional
+        The number of seconds added before every response.
+    failure_rate : float, optional
+        The fraction of GET requests to the API answered with a 503, to
+        exercise retries.  Submissions and results downloads never fail.
+    api_key : str, optional
+        If given, API requests without this key are refused with a 401.
+    data_dir : str, optional
+        The directory in which synthetic results are kept, and reused by
+        later servers.  Defaults to a temporary directory removed by
+        `stop`.
+    seed : int, optional
+        Seeds the failures and errors, so that runs are repeatable.
+    """
+    def __init__(self,
+                 maximum=10,
+                 workers=None,
+                 run_time=0.0,
+                 error_rate=0.0,
+                 results_size=64 * 1024,
+                 latency=0.0,
+                 failure_rate=0.0,
+                 api_key=None,
+                 data_dir=None,
+                 seed=0):
+        self.maximum = maximum
+        self.workers = workers if workers is not None else maximum
+        self.run_time = run_time
+        self.error_rate = error_rate
+        self.results_size = results_size
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.api_key = api_key
+
+        if data_dir is None:
+            self.data_dir = tempfile.mkdtemp(prefix='aqueduct-fake-')
+            self._owns_data_dir = True
+        else:
+            self.data_dir = os.path.expanduser(data_dir)
+            self._owns_data_dir = False
+            if not os.path.isdir(self.data_dir):
+                os.makedirs(self.data_dir)
+
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._executions = {}
+        self._results = {}
+        self._errors = {}
+
+        # times at which each worker next becomes free, and at which each
+        # active execution finishes.
+        self._free_at = [0.0] * self.workers
+        self._finishing = []
+
+        self._lock = threading.Lock()
+        self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def base_url(self):
+        """
+        The url to pass to `create_client` as ``base_url``.
+        """
+        return 'http://127.0.0.1:{port}/api'.format(
+            port=self._server.server_port,
+        )
+
+    def start(self):
+        """
+        Starts serving, and returns the base url of the API.
+        """
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+
+        # check for `stop` often, so that stopping doesn't take half a
+        # second, as it otherwise would.
+        thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={'poll_interval': 0.01},
+        )
+        thread.daemon = True
+        thread.start()
+
+        return self.base_url
+
+    def stop(self):
+        """
+        Stops serving, and removes the synthetic results if they were kept
+        in a temporary directory.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+        if self._owns_data_dir:
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def add_execution(self,
+                      status="SUCCESS",
+                      results_size=None,
+                      asset_identifier_format="sid",
+                      compression=None,
+                      **fields):
+        """
+        Adds an execution that has already finished, and returns its id.
+
+        Parameters
+        ----------
+        status : str, optional
+            "SUCCESS" or "FAILED".
+        results_size : int, optional
+            The approximate size, in bytes, of its csv results.  Defaults
+            to the server's `results_size`; pass 0 for results with no
+            rows.
+        asset_identifier_format : str, optional
+            The asset identifier format of its results.
+        compression : str, optional
+            "gzip" to store its csv results gzipped, as served.
+        **fields
+            Any further metadata of the execution, such as its name.
+        """
+        with self._lock:
+            execution_id = self._new_id()
+            execution = _execution(
+                execution_id,
+                asset_identifier_format=asset_identifier_format,
+                **fields
+            )
+            execution["status"] = status
+            self._executions[execution_id] = (execution, 0.0)
+            self._add_outputs(execution, results_size, compression)
+
+        return execution_id
+
+    def results_path(self, execution_id, result_format=None):
+        """
+        Returns the path of the file served as the results of an execution
+        in `result_format`, by default the format it was submitted with,
+        writing it first if no execution has needed it yet.
+        """
+        size, asset_identifier_format, stored_format, compression = \
+            self._results[execution_id]
+
+        path = synthetic_results(size, self.data_dir, asset_identifier_format)
+        return _convert_results(
+            path,
+            result_format or stored_format,
+            compression,
+        )
+
+    def executions(self):
+        """
+        Returns the current metadata of every execution.
+        """
+        with self._lock:
+            return [
+                self._metadata(execution_id)
+                for execution_id in self._executions
+            ]
+
+    def _new_id(self):
+        return '{n:024x}'.format(n=next(self._ids))
+
+    def _submit(self, body):
+        now = time.time()
+        with self._lock:
+            running = self._active(now)
+            if running >= self.maximum:
+                return 429, {"current": running, "allowed": self.maximum}
+
+            missing = [
+                key for key in ("code", "start_date", "end_date")
+                if key not in body
+            ]
+            if missing or body.get(
+                "asset_identifier_format", "sid",
+            ) not in ASSET_IDENTIFIER_FORMATS:
+                return 400, {"error": "invalid submission"}
+
+            run_time = self.run_time
+            if callable(run_time):
+                run_time = run_time(body)
+
+            # executions start in the order they were submitted, as soon as
+            # a worker is free.
+            starts_at = max(now, heapq.heappop(self._free_at))
+            finishes_at = starts_at + run_time
+            heapq.heappush(self._free_at, finishes_at)
+            heapq.heappush(self._finishing, finishes_at)
+
+            execution_id = self._new_id()
+            execution = _execution(execution_id, **body)
+            execution["status"] = (
+                "FAILED" if self._random.random() < self.error_rate
+                else "SUCCESS"
+            )
+            self._executions[execution_id] = (execution, finishes_at)
+            self._add_outputs(execution, None, None)
+
+        return 200, {"pipeline_id": execution_id}
+
+    def _add_outputs(self, execution, results_size, compression):
+        if execution["status"] == "FAILED":
+            self._errors[execution["id"]] = {
+                "date": execution["start_date"],
+                "name": "ValueError",
+                "message": "Simulated pipeline error.",
+                "lineno": 1,
+                "method": "make_pipeline",
+            }
+        else:
+            # the csv is only written once it is first downloaded, outside
+            # of the lock, so that writing it never holds up other requests.
+            self._results[execution["id"]] = (
+                self.results_size if results_size is None else results_size,
+                execution["asset_identifier_format"],
+                execution.get("result_format") or "csv",
+                compression,
+            )
+
+    def _active(self, now):
+        """
+        Returns the number of executions that are queued or running.
+        """
+        while self._finishing and self._finishing[0] <= now:
+            heapq.heappop(self._finishing)
+        return len(self._finishing)
+
+    def _metadata(self, execution_id, now=None):
+        try:
+            execution, finishes_at = self._executions[execution_id]
+        except KeyError:
+            return None
+
+        if finishes_at > (now or time.time()):
+            return dict(execution, status="IN-PROGRESS")
+        return dict(execution)
+
+    def _handle(self, method, path, headers, body, params=None):
+        """
+        Returns the status and json body of the response to an API request.
+        """
+        if self.api_key is not None and \
+                headers.get('Quantopian-API-Key') != self.api_key:
+            return 401, {"error": "invalid API key"}
+
+        if method == 'GET':
+            with self._lock:
+                if self._random.random() < self.failure_rate:
+                    return 503, {"error": "simulated failure"}
+
+        if method == 'POST':
+            if path:
+                return 404, {"error": "not found"}
+            return self._submit(body)
+
+        parts = [part for part in path.split('/') if part]
+        with self._lock:
+            if not parts:
+                now = time.time()
+                return 200, {"pipelines": [
+                    self._metadata(execution_id, now)
+                    for execution_id in self._executions
+                ]}
+
+            if parts == ['concurrent_executions_info']:
+                return 200, {
+                    "running": self._active(time.time()),
+                    "maximum": self.maximum,
+                }
+
+            execution = self._metadata(parts[0])
+            if execution is None or len(parts) > 2:
+                return 404, {"error": "not found"}
+
+            if len(parts) == 1:
+                return 200, {"pipeline": execution}
+
+            if parts[1] == 'results_url' and \
+                    execution["status"] == "SUCCESS":
+                url = "http://127.0.0.1:{port}/results/{id}".format(
+                    port=self._server.server_port,
+                    id=parts[0],
+                )
+                result_format = (params or {}).get('format')
+                if result_format in RESULT_FORMATS:
+                    url += '?' + urlencode({'format': result_format})
+                return 200, {"url": url}
+
+            if parts[1] == 'exception' and execution["status"] == "FAILED":
+                return 200, self._errors[parts[0]]
+
+        return 404, {"error": "not found"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # headers and bodies are written separately, which would otherwise be
+    # held back by Nagle's algorithm on kept-alive connections.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        fake = self.server.fake
+        time.sleep(fake.latency)
+
+        path, _, query = self.path.partition('?')
+        params = {
+            key: values[-1] for key, values in parse_qs(query).items()
+        }
+        if path.startswith('/results/'):
+            return self._send_results(
+                path[len('/results/'):],
+                params.get('format'),
+            )
+
+        if path == '/api' or path.startswith('/api/'):
+            status, body = fake._handle(
+                'GET',
+                path[4:],
+                self.headers,
+                None,
+                params,
+            )
+        else:
+            status, body = 404, {"error": "not found"}
+
+        self._send_json(status, body)
+
+    def do_POST(self):
+        fake = self.server.fake
+        time.sleep(fake.latency)
+
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError:
+            return self._send_json(400, {"error": "invalid json"})
+
+        path = self.path.split('?')[0]
+        if path == '/api' or path.startswith('/api/'):
+            status, body = fake._handle('POST', path[4:], self.headers, body)
+        else:
+            status, body = 404, {"error": "not found"}
+
+        self._send_json(status, body)
+
+    def _send_json(self, status, obj):
+        body = json.dumps(obj).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_results(self, execution_id, result_format):
+        fake = self.server.fake
+        if execution_id not in fake._results:
+            return self._send_json(404, {"error": "not found"})
+        path = fake.results_path(execution_id, result_format)
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+
+        range_header = self.headers.get('Range')
+        if range_header and range_header.startswith('bytes='):
+            first, _, last = range_header[len('bytes='):].partition('-')
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if start >= size:
+                self.send_response(416)
+                self.send_header(
+                    'Content-Range',
+                    'bytes */{size}'.format(size=size),
+                )
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            self.send_response(206)
+            self.send_header(
+                'Content-Range',
+                'bytes {start}-{end}/{size}'.format(
+                    start=start,
+                    end=end,
+                    size=size,
+                ),
+            )
+        else:
+            self.send_response(200)
+
+        self.send_header('Content-Type', _CONTENT_TYPES.get(
+            os.path.splitext(path)[1],
+            'text/csv',
+        ))
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+
+        with open(path, 'rb') as results_file:
+            results_file.seek(start)
+            remaining = end - start + 1
+            while remaining:
+                chunk = results_file.read(min(_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+
+def synthetic_results(size, data_dir, asset_identifier_format="sid"):
+    """
+    Returns the path of a csv of pipeline results of about `size` bytes,
+    indexed by date and `asset_identifier_format`, writing it to `data_dir`
+    if it isn't there yet.
+    """
+    path = os.path.join(
+        data_dir,
+        'results-{fmt}-{size}.csv'.format(
+            fmt=asset_identifier_format,
+            size=size,
+        ),
+    )
+    if os.path.exists(path):
+        return path
+
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.RandomState(size % (2 ** 32))
+    sids = np.arange(ASSETS_PER_DATE)
+    if asset_identifier_format == "sid":
+        assets = sids
+    else:
+        assets = np.array(['A{sid:05d}'.format(sid=sid) for sid in sids])
+    sectors = np.array(['Energy', 'Financials', 'Health Care', 'Technology'])
+
+    fd, tmp_path = tempfile.mkstemp(dir=data_dir)
+    with os.fdopen(fd, 'w') as results_file:
+        results_file.write(
+            'date,{fmt},alpha,beta,sector,liquid\n'.format(
+                fmt=asset_identifier_format,
+            )
+        )
+        written = 0
+        date = pd.Timestamp('2000-01-03', tz='UTC')
+        while written < size:
+            block = pd.DataFrame({
+                'date': date,
+                asset_identifier_format: assets,
+                'alpha': rng.standard_normal(ASSETS_PER_DATE),
+                'beta': rng.uniform(0, 2, ASSETS_PER_DATE),
+                'sector': sectors[sids % len(sectors)],
+                'liquid': rng.uniform(size=ASSETS_PER_DATE) < 0.8,
+            })
+            text = block.to_csv(header=False, index=False)
+            results_file.write(text)
+            written += len(text)
+            date += pd.offsets.BDay()
+
+    # several requests may write the same results at once, and whichever
+    # finishes last wins.
+    os.replace(tmp_path, path)
+    return path
+
+
+def _convert_results(path, result_format, compression):
+    """
+    Returns the path of the synthetic csv results at `path` in
+    `result_format`, or gzipped if `compression` is "gzip", converting them
+    if that hasn't been done yet.
+    """
+    if result_format == 'csv' and compression is None:
+        return path
+
+    if result_format == 'csv':
+        converted = path + '.gz'
+    else:
+        converted = os.path.splitext(path)[0] + '.' + result_format
+    if os.path.exists(converted):
+        return converted
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    os.close(fd)
+
+    if result_format == 'csv':
+        with open(path, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+    else:
+        import pandas as pd
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(
+            pd.read_csv(path, parse_dates=['date']),
+            preserve_index=False,
+        )
+        if result_format == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp_path)
+        else:
+            with pa.ipc.new_file(tmp_path, table.schema) as writer:
+                writer.write_table(table)
+
+    os.replace(tmp_path, converted)
+    return converted
+
+
+def _execution(execution_id, **fields):
+    execution = {
+        "id": execution_id,
+        "status": "SUCCESS",
+        "start_date": "2000-01-03",
+        "end_date": "2000-12-29",
+        "code": "",
+        "params": {},
+        "name": None,
+        "asset_identifier_format": "sid",
+        "created_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    execution.update(fields)
+    return execution
@@ -1,6 +1,13 @@
+import datetime
 import os
+import random
 
-import pandas as pd
+try:
+    # py3
+    from time import monotonic
+except ImportError:
+    # py2
+    from time import time as monotonic  # noqa: F401
 
 try:
     # py3
@@ -9,6 +16,15 @@ except ImportError:
     # py2
     from ConfigParser import SafeConfigParser as ConfigParser
 
+# The ways in which assets can be identified in pipeline results.
+ASSET_IDENTIFIER_FORMATS = ("symbol", "sid", "fsym_region_id")
+
+# The formats in which pipeline results can be requested.
+RESULT_FORMATS = ("csv", "parquet", "arrow")
+
+# Statuses of pipeline executions that have stopped running.
+FINISHED_STATUSES = ("SUCCESS", "FAILED")
+
 
 def load_api_key():
     """
@@ -59,7 +75,30 @@ def normalize_date_input(date_like):
     """
     Utility method that tries to parse a date-like object and
     returns a datetime.date.
+
+    Dates, datetimes and "YYYY-MM-DD" strings are handled without pandas,
+    which is only imported to parse anything else.
     """
+    if isinstance(date_like, datetime.datetime):
+        if date_like.time() != datetime.time(0) or \
+                getattr(date_like, 'nanosecond', 0):
+            raise ValueError(
+                "Date {date} is not a date".format(date=date_like)
+            )
+        return date_like.date()
+
+    if isinstance(date_like, datetime.date):
+        return date_like
+
+    if isinstance(date_like, str):
+        try:
+            return datetime.datetime.strptime(date_like, '%Y-%m-%d').date()
+        except ValueError:
+            # some other format, which pandas may understand
+            pass
+
+    import pandas as pd
+
     try:
         timestamp = pd.Timestamp(date_like)
     except ValueError:
@@ -69,3 +108,57 @@ def normalize_date_input(date_like):
         raise ValueError("Date {date} is not a date".format(date=date_like))
 
     return timestamp.date()
+
+
+def backoff_intervals(initial, maximum, factor=2):
+    """
+    Utility method that yields an endless sequence of jittered,
+    exponentially growing wait intervals, in seconds.
+
+    Each interval is drawn uniformly from the upper half of the current
+    backoff, which starts at `initial` and is multiplied by `factor` after
+    every step until it reaches `maximum`.
+    """
+    interval = initial
+    while True:
+        yield interval / 2.0 + random.uniform(0, interval / 2.0)
+        interval = min(interval * factor, maximum)
+
+
+def split_date_range(start_date, end_date, shard):
+    """
+    Utility method that splits an inclusive date range into consecutive,
+    non-overlapping sub-ranges.
+
+    Parameters
+    ----------
+    start_date : datetime.date
+        The first date in the range.
+    end_date : datetime.date
+        The last date in the range.
+    shard : str
+        A pandas frequency string, such as "1Y", "Q" or "90D", giving the
+        length of each sub-range.  Calendar frequencies are aligned to
+        calendar boundaries, so the first and last sub-ranges may be
+        shorter.
+
+    Returns
+    -------
+    list of (datetime.date, datetime.date)
+        The first and last date of each sub-range, in order.
+    """
+    import pandas as pd
+
+    periods = pd.period_range(
+        pd.Timestamp(start_date),
+        pd.Timestamp(end_date),
+        freq=shard,
+    )
+
+    return [
+        (
+            max(period.start_time.date(), start_date),
+            min(period.end_time.date(), end_date),
+        )
+        for period in periods
+    ]
@@ -0,0 +1,103 @@
+"""
+Benchmarks how long ``import aqueduct_client`` takes, and checks that it
+doesn't import any of the modules that are only needed for results.
+
+Each import runs in a fresh interpreter.  For example::
+
+    python benchmarks/import_time.py --repeat 20 --max-seconds 0.3
+
+exits with an error if pandas, numpy or pyarrow were imported, or if the
+median import took longer than ``--max-seconds``.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Modules that must not be imported until results are loaded.
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow')
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SCRIPT = """
+import json, sys, time
+start = time.time()
+import {module}
+elapsed = time.time() - start
+print(json.dumps([elapsed, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def time_import(module):
+    """
+    Returns the number of seconds a fresh interpreter takes to import
+    `module`, and the heavy modules that were imported along with it.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [_ROOT] + [p for p in [env.get('PYTHONPATH')] if p],
+    )
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            '-c',
+            _SCRIPT.format(module=module, heavy=HEAVY_MODULES),
+        ],
+        env=env,
+    )
+    elapsed, heavy = json.loads(output.decode('utf-8'))
+    return elapsed, heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--modules',
+        nargs='+',
+        default=[
+            'aqueduct_client',
+            'aqueduct_client.retry',
+            'aqueduct_client.ratelimit',
+            'aqueduct_client.instrumentation',
+        ],
+    )
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument(
+        '--max-seconds',
+        type=float,
+        default=None,
+        help='fail if the median import takes longer than this',
+    )
+    args = parser.parse_args(argv)
+
+    failed = False
+    print('{:<34} {:>9} {:>9}  {}'.format(
+        'module', 'p50 (s)', 'max (s)', 'heavy imports',
+    ))
+    for module in args.modules:
+        times = []
+        heavy = set()
+        for _ in range(args.repeat):
+            elapsed, imported = time_import(module)
+            times.append(elapsed)
+            heavy.update(imported)
+
+        times.sort()
+        median = times[len(times) // 2]
+        print('{:<34} {:>9.3f} {:>9.3f}  {}'.format(
+            module,
+            median,
+            times[-1],
+            ', '.join(sorted(heavy)) or '-',
+        ))
+
+        if heavy or (args.max_seconds is not None and
+                     median > args.max_seconds):
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
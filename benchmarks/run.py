@@ -0,0 +1,230 @@
+"""
+Benchmarks the client against a local stand-in for the Aqueduct API.
+
+Each benchmark runs in a fresh process, so that its peak RSS is its own.
+For example::
+
+    python benchmarks/run.py --sizes 1MB 64MB 1GB --latency 0.02
+
+prints, for each benchmark, the latency percentiles of its calls, its
+throughput, and the peak RSS of the process that ran it.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    # windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aqueduct_client import create_client  # noqa: E402
+from aqueduct_client.testing import FakeAqueductServer  # noqa: E402
+
+BENCHMARKS = ('results', 'submit', 'poll')
+
+_UNITS = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def bench_results(client, server, size, repeat):
+    """
+    Times `get_pipeline_results_dataframe` on results of `size` bytes.
+    """
+    execution_id = server.add_execution(results_size=size)
+    nbytes = os.path.getsize(server.results_path(execution_id))
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.time()
+        client.get_pipeline_results_dataframe(execution_id)
+        latencies.append(time.time() - start)
+
+    return latencies, nbytes
+
+
+def bench_submit(client, server, size, repeat):
+    """
+    Times `submit_pipeline_execution`.
+    """
+    latencies = []
+    for _ in range(repeat):
+        start = time.time()
+        client.submit_pipeline_execution(
+            "benchmark",
+            "2000-01-03",
+            "2000-12-29",
+        )
+        latencies.append(time.time() - start)
+
+    return latencies, 0
+
+
+def bench_poll(client, server, size, repeat):
+    """
+    Times how long `wait_for_execution` takes to notice that an execution
+    has finished, beyond the execution's own run time.
+    """
+    latencies = []
+    for _ in range(repeat):
+        execution_id = client.submit_pipeline_execution(
+            "benchmark",
+            "2000-01-03",
+            "2000-12-29",
+        )
+        start = time.time()
+        client.wait_for_execution(execution_id, poll_interval=0.05)
+        latencies.append(time.time() - start - server.run_time)
+
+    return latencies, 0
+
+
+def run_case(name, size, args, queue):
+    """
+    Runs one benchmark in this process, and puts its measurements on
+    `queue`.
+    """
+    server = FakeAqueductServer(
+        maximum=args.repeat + 1,
+        run_time=args.run_time,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        data_dir=args.data_dir or os.path.join(
+            tempfile.gettempdir(),
+            'aqueduct-benchmarks',
+        ),
+    )
+    with server:
+        client = create_client(api_key='benchmark', base_url=server.base_url)
+        bench = globals()['bench_' + name]
+        latencies, nbytes = bench(client, server, size, args.repeat)
+
+    queue.put({
+        'latencies': latencies,
+        'bytes': nbytes,
+        'peak_rss': peak_rss(),
+    })
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process in bytes, or None
+    if it can't be measured.
+    """
+    if resource is None:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def percentile(values, q):
+    values = sorted(values)
+    index = min(int(round(q * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    for unit, factor in _UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def format_size(nbytes):
+    if nbytes is None:
+        return '-'
+    for unit in ('GB', 'MB', 'KB'):
+        if nbytes >= _UNITS[unit]:
+            return '{:.1f}{}'.format(nbytes / float(_UNITS[unit]), unit)
+    return '{}B'.format(nbytes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--benchmarks',
+        nargs='+',
+        choices=BENCHMARKS,
+        default=list(BENCHMARKS),
+    )
+    parser.add_argument(
+        '--sizes',
+        nargs='+',
+        default=['1MB', '64MB'],
+        help='sizes of the results to load, such as 1MB or 2GB',
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0.0,
+        help='seconds added before every response',
+    )
+    parser.add_argument(
+        '--failure-rate',
+        type=float,
+        default=0.0,
+        help='fraction of API requests that fail with a 503',
+    )
+    parser.add_argument(
+        '--run-time',
+        type=float,
+        default=0.5,
+        help='seconds for which submitted executions run',
+    )
+    parser.add_argument(
+        '--data-dir',
+        help='where synthetic results are kept between runs',
+    )
+    args = parser.parse_args(argv)
+
+    cases = []
+    for name in args.benchmarks:
+        if name == 'results':
+            cases.extend((name, parse_size(size)) for size in args.sizes)
+        else:
+            cases.append((name, None))
+
+    print('{:<10} {:>9} {:>9} {:>9} {:>11} {:>10}'.format(
+        'benchmark', 'size', 'p50 (s)', 'p99 (s)', 'throughput', 'peak RSS',
+    ))
+
+    context = multiprocessing.get_context('spawn')
+    for name, size in cases:
+        queue = context.Queue()
+        process = context.Process(
+            target=run_case,
+            args=(name, size, args, queue),
+        )
+        process.start()
+        result = queue.get()
+        process.join()
+
+        latencies = result['latencies']
+        if result['bytes']:
+            throughput = '{}/s'.format(format_size(
+                int(result['bytes'] * len(latencies) / sum(latencies)),
+            ))
+        else:
+            throughput = '{:.1f}/s'.format(len(latencies) / sum(latencies))
+
+        print('{:<10} {:>9} {:>9.3f} {:>9.3f} {:>11} {:>10}'.format(
+            name,
+            format_size(result['bytes']) if size else '-',
+            percentile(latencies, 0.5),
+            percentile(latencies, 0.99),
+            throughput,
+            format_size(result['peak_rss']),
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -13,11 +13,19 @@ if 'upload' in sys.argv:
 
 def install_requires():
     return [
+        'futures; python_version < "3"',
         'pandas',
         'requests',
     ]
 
 
+def extras_require():
+    return {
+        'aio': ['aiohttp'],
+        'arrow': ['pyarrow'],
+    }
+
+
 setup(
     name='aqueduct-client',
     cmdclass=versioneer.get_cmdclass(),
@@ -39,4 +47,5 @@ setup(
     ],
     url='https://github.com/quantopian/aqueduct-client',
     install_requires=install_requires(),
+    extras_require=extras_require(),
 )
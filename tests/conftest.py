@@ -0,0 +1,31 @@
+import pytest
+
+from aqueduct_client import create_client
+from aqueduct_client.retry import RetryPolicy
+from aqueduct_client.testing import FakeAqueductServer
+
+
+@pytest.fixture
+def server():
+    with FakeAqueductServer() as server:
+        yield server
+
+
+@pytest.fixture
+def make_client(server):
+    """
+    Returns a function that creates clients of `server`, or of another
+    fake, which retry quickly so that tests don't wait on backoff.
+    """
+    def make_client(fake=server, **kwargs):
+        kwargs.setdefault(
+            'retry_policy',
+            RetryPolicy(interval=0.01, max_interval=0.05),
+        )
+        return create_client(
+            api_key='test',
+            base_url=fake.base_url,
+            **kwargs
+        )
+
+    return make_client
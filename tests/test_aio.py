@@ -0,0 +1,188 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from aqueduct_client import results  # noqa: E402
+from aqueduct_client.aio import create_async_client  # noqa: E402
+from aqueduct_client.errors import (  # noqa: E402
+    ConcurrentExecutionsExceeded,
+    PipelineExecutionTimeout,
+)
+from aqueduct_client.testing import FakeAqueductServer  # noqa: E402
+
+
+def read_expected(server, execution_id):
+    return pd.read_csv(
+        server.results_path(execution_id, 'csv'),
+        index_col=['date', 'sid'],
+        parse_dates=['date'],
+        float_precision='round_trip',
+    )
+
+
+def run(server, coroutine_function):
+    """
+    Runs ``coroutine_function(client)`` with an async client of `server`.
+    """
+    async def main():
+        async with create_async_client(
+            api_key='test',
+            base_url=server.base_url,
+        ) as client:
+            return await coroutine_function(client)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('result_format', ['csv', 'parquet', 'arrow'])
+def test_results_in_format(server, monkeypatch, result_format):
+    pytest.importorskip('pyarrow')
+    execution_id = server.add_execution()
+
+    headers = []
+    read_results_file = results.read_results_file
+
+    def record_format(path, *args, **kwargs):
+        with open(path, 'rb') as f:
+            headers.append(f.read(4))
+        return read_results_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(results, 'read_results_file', record_format)
+    result_df = run(
+        server,
+        lambda client: client.get_pipeline_results_dataframe(
+            execution_id,
+            result_format=result_format,
+        ),
+    )
+
+    pd.testing.assert_frame_equal(
+        result_df,
+        read_expected(server, execution_id),
+    )
+    assert headers == [{
+        'csv': b'date',
+        'parquet': b'PAR1',
+        'arrow': b'ARRO',
+    }[result_format]]
+
+
+def test_invalid_result_format(server):
+    execution_id = server.add_execution()
+
+    with pytest.raises(ValueError):
+        run(
+            server,
+            lambda client: client.get_pipeline_results_dataframe(
+                execution_id,
+                result_format='xlsx',
+            ),
+        )
+
+
+def test_submit_and_wait():
+    with FakeAqueductServer(run_time=0.1) as server:
+        async def submit_and_wait(client):
+            execution_id = await client.submit_pipeline_execution(
+                'code',
+                '2000-01-03',
+                '2000-01-31',
+                name='alpha',
+            )
+            pipeline = await client.wait_for_execution(
+                execution_id,
+                poll_interval=0.01,
+                max_interval=0.05,
+            )
+            result_df = await client.wait_for_execution(
+                execution_id,
+                fetch_results=True,
+            )
+            quota = await client.get_pipeline_execution_quota()
+            executions = await client.get_all_pipeline_executions()
+            return execution_id, pipeline, result_df, quota, executions
+
+        execution_id, pipeline, result_df, quota, executions = \
+            run(server, submit_and_wait)
+
+        assert pipeline['id'] == execution_id
+        assert pipeline['status'] == 'SUCCESS'
+        assert pipeline['name'] == 'alpha'
+        pd.testing.assert_frame_equal(
+            result_df,
+            read_expected(server, execution_id),
+        )
+        assert quota == {'running': 0, 'maximum': server.maximum}
+        assert [execution['id'] for execution in executions] == \
+            [execution_id]
+
+
+def test_concurrent_downloads(server):
+    execution_ids = [server.add_execution() for _ in range(4)]
+
+    async def download_all(client):
+        return await asyncio.gather(*[
+            client.get_pipeline_results_dataframe(execution_id)
+            for execution_id in execution_ids
+        ])
+
+    for execution_id, result_df in zip(
+        execution_ids,
+        run(server, download_all),
+    ):
+        pd.testing.assert_frame_equal(
+            result_df,
+            read_expected(server, execution_id),
+        )
+
+
+def test_wait_timeout():
+    with FakeAqueductServer(run_time=10) as server:
+        async def wait(client):
+            execution_id = await client.submit_pipeline_execution(
+                'code',
+                '2000-01-03',
+                '2000-01-31',
+            )
+            await client.wait_for_execution(
+                execution_id,
+                timeout=0.1,
+                poll_interval=0.01,
+            )
+
+        with pytest.raises(PipelineExecutionTimeout):
+            run(server, wait)
+
+
+def test_quota_exceeded():
+    with FakeAqueductServer(maximum=0) as server:
+        with pytest.raises(ConcurrentExecutionsExceeded):
+            run(
+                server,
+                lambda client: client.submit_pipeline_execution(
+                    'code',
+                    '2000-01-03',
+                    '2000-01-31',
+                ),
+            )
+
+
+def test_failed_execution(server):
+    execution_id = server.add_execution(status='FAILED')
+
+    error = run(
+        server,
+        lambda client: client.get_pipeline_execution_error(execution_id),
+    )
+    assert error['name'] == 'ValueError'
+
+    with pytest.raises(ValueError):
+        run(
+            server,
+            lambda client: client.get_pipeline_results_dataframe(
+                execution_id,
+            ),
+        )
@@ -0,0 +1,113 @@
+import glob
+import os
+
+import pytest
+
+
+@pytest.fixture
+def client(make_client, tmpdir):
+    return make_client(cache_dir=str(tmpdir))
+
+
+def test_results_are_cached(server, client):
+    execution_id = server.add_execution()
+
+    first = client.get_pipeline_results_dataframe(execution_id)
+    second = client.get_pipeline_results_dataframe(execution_id)
+
+    stats = client.stats()
+    assert stats['cache']['results'] == {
+        'hits': 1,
+        'misses': 1,
+        'hit_rate': 0.5,
+    }
+    assert stats['phases']['download']['count'] == 1
+    assert first.equals(second)
+
+
+def test_subset_of_cached_results(server, client):
+    # a few dates of results
+    execution_id = server.add_execution(results_size=512 * 1024)
+    full = client.get_pipeline_results_dataframe(execution_id)
+
+    subset = client.get_pipeline_results_dataframe(
+        execution_id,
+        columns=['alpha'],
+        start='2000-01-04',
+        end='2000-01-05',
+    )
+
+    assert client.stats()['phases']['download']['count'] == 1
+    assert list(subset.columns) == ['alpha']
+    dates = subset.index.get_level_values('date').unique()
+    assert [str(date.date()) for date in dates] == [
+        '2000-01-04',
+        '2000-01-05',
+    ]
+    assert subset['alpha'].equals(full['alpha'].loc[subset.index])
+
+
+def test_subset_is_not_cached(server, client, tmpdir):
+    execution_id = server.add_execution()
+
+    client.get_pipeline_results_dataframe(execution_id, columns=['alpha'])
+
+    assert client._results_cache.get(execution_id) is None
+
+
+def test_corrupt_entry_is_a_miss(server, client, tmpdir):
+    execution_id = server.add_execution()
+    expected = client.get_pipeline_results_dataframe(execution_id)
+
+    [path] = glob.glob(os.path.join(str(tmpdir), execution_id + '.*'))
+    with open(path, 'wb') as f:
+        f.write(b'not results')
+
+    result_df = client.get_pipeline_results_dataframe(execution_id)
+
+    assert result_df.equals(expected)
+    assert client.stats()['cache']['results']['hits'] == 0
+    # the entry was replaced by the fresh download
+    assert client._results_cache.get(execution_id).equals(expected)
+
+
+def test_failed_put_returns_results(server, client):
+    execution_id = server.add_execution()
+
+    def put(*args):
+        raise IOError("disk full")
+
+    client._results_cache.put = put
+    result_df = client.get_pipeline_results_dataframe(execution_id)
+
+    assert len(result_df)
+
+
+def test_eviction(server, make_client, tmpdir):
+    client = make_client(cache_dir=str(tmpdir), cache_max_size=1)
+    execution_id = server.add_execution()
+
+    client.get_pipeline_results_dataframe(execution_id)
+
+    assert client._results_cache.get(execution_id) is None
+
+
+def test_partial_downloads_are_evicted(server, make_client, tmpdir):
+    client = make_client(cache_dir=str(tmpdir), cache_max_size=1000)
+    cache = client._results_cache
+    partial_dir = os.path.join(str(tmpdir), 'partial')
+
+    abandoned = cache.claim_partial('abandoned', 'csv')
+    in_progress = cache.claim_partial('in_progress', 'csv')
+    for path in (abandoned, in_progress):
+        with open(path, 'wb') as f:
+            f.write(b'x' * 600)
+    os.utime(abandoned, (0, 0))
+
+    interrupted = cache.claim_partial('interrupted', 'csv')
+    with open(interrupted, 'wb') as f:
+        f.write(b'x' * 600)
+    cache.keep_partial('interrupted', 'csv', interrupted)
+
+    # downloads still being written to are never removed
+    assert os.listdir(partial_dir) == [os.path.basename(in_progress)]
@@ -0,0 +1,295 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import pandas as pd
+import pytest
+
+from aqueduct_client.errors import ResultsDownloadError
+
+
+def read_expected(server, execution_id, result_format=None):
+    return pd.read_csv(
+        server.results_path(execution_id, result_format),
+        index_col=['date', 'sid'],
+        parse_dates=['date'],
+        float_precision='round_trip',
+    )
+
+
+def assert_results_equal(result_df, expected):
+    pd.testing.assert_frame_equal(result_df, expected)
+
+
+def test_download(server, make_client):
+    client = make_client()
+    execution_id = server.add_execution()
+
+    result_df = client.get_pipeline_results_dataframe(execution_id)
+
+    assert_results_equal(result_df, read_expected(server, execution_id))
+    assert client.stats()['bytes']['download'] == \
+        os.path.getsize(server.results_path(execution_id))
+
+
+def test_resume_partial_download(server, make_client, tmpdir):
+    client = make_client(cache_dir=str(tmpdir))
+    execution_id = server.add_execution(results_size=256 * 1024)
+
+    with open(server.results_path(execution_id), 'rb') as f:
+        body = f.read()
+
+    # a previous load got this far before its connection dropped
+    partial_path = client._results_cache.partial_path(execution_id, 'csv')
+    with open(partial_path, 'wb') as f:
+        f.write(body[:100000])
+
+    result_df = client.get_pipeline_results_dataframe(execution_id)
+
+    assert_results_equal(result_df, read_expected(server, execution_id))
+    assert client.stats()['bytes']['download'] == len(body) - 100000
+    assert os.listdir(os.path.dirname(partial_path)) == []
+
+
+def test_stale_partial_download_is_discarded(server, make_client, tmpdir):
+    client = make_client(cache_dir=str(tmpdir))
+    execution_id = server.add_execution()
+    size = os.path.getsize(server.results_path(execution_id))
+
+    # longer than the results, so the server can't serve the rest of it
+    partial_path = client._results_cache.partial_path(execution_id, 'csv')
+    with open(partial_path, 'wb') as f:
+        f.write(b'x' * (size + 10))
+
+    result_df = client.get_pipeline_results_dataframe(execution_id)
+
+    assert_results_equal(result_df, read_expected(server, execution_id))
+
+
+def test_interrupted_download_is_kept(server, make_client, tmpdir):
+    client = make_client(cache_dir=str(tmpdir))
+    execution_id = server.add_execution()
+
+    def download_results(execution_id, result_format, results_path):
+        with open(results_path, 'ab') as f:
+            f.write(b'date,sid')
+        raise IOError("connection dropped")
+
+    client._download_results = download_results
+    with pytest.raises(IOError):
+        client.get_pipeline_results_dataframe(execution_id)
+
+    partial_path = client._results_cache.partial_path(execution_id, 'csv')
+    with open(partial_path, 'rb') as f:
+        assert f.read() == b'date,sid'
+
+
+def test_concurrent_loads_share_cache_dir(server, make_client, tmpdir):
+    execution_id = server.add_execution(results_size=1024 * 1024)
+    expected = read_expected(server, execution_id)
+
+    # separate clients, as separate processes sharing the cache would be
+    clients = [make_client(cache_dir=str(tmpdir)) for _ in range(3)]
+    with ThreadPoolExecutor(len(clients)) as pool:
+        futures = [
+            pool.submit(client.get_pipeline_results_dataframe, execution_id)
+            for client in clients
+        ]
+        for future in futures:
+            assert_results_equal(future.result(), expected)
+
+    assert os.listdir(os.path.join(str(tmpdir), 'partial')) == []
+
+
+def test_download_in_parts(server, make_client):
+    client = make_client(download_parts=4, download_part_threshold=1)
+    execution_id = server.add_execution(results_size=512 * 1024)
+    size = os.path.getsize(server.results_path(execution_id))
+
+    ranges = []
+    download_part = client._download_part
+
+    def record_part(execution_id, url, results_path, part, stop):
+        ranges.append(tuple(part))
+        download_part(execution_id, url, results_path, part, stop)
+
+    client._download_part = record_part
+    result_df = client.get_pipeline_results_dataframe(execution_id)
+
+    assert_results_equal(result_df, read_expected(server, execution_id))
+    assert len(ranges) == 4
+    assert sorted(ranges)[-1][1] == size - 1
+    assert client.stats()['bytes']['download'] == size
+
+
+def test_failed_part_is_retried_alone(server, make_client):
+    client = make_client(download_parts=4, download_part_threshold=1)
+    execution_id = server.add_execution(results_size=512 * 1024)
+    size = os.path.getsize(server.results_path(execution_id))
+
+    ranges = []
+    download_part = client._download_part
+
+    def fail_last_part_once(execution_id, url, results_path, part, stop):
+        ranges.append(tuple(part))
+        if part[1] == size - 1 and len(ranges) <= 4:
+            raise ResultsDownloadError(execution_id, "HTTP 403")
+        download_part(execution_id, url, results_path, part, stop)
+
+    client._download_part = fail_last_part_once
+    result_df = client.get_pipeline_results_dataframe(execution_id)
+
+    assert_results_equal(result_df, read_expected(server, execution_id))
+    # only the bytes that were still missing were requested again
+    assert client.stats()['bytes']['download'] == size
+    assert client.stats()['retries']['download'] == 1
+    # the failed part, and any of the others stopped before they finished
+    assert ranges[-1][1] == size - 1
+    assert len(ranges) <= 8
+
+
+def test_small_results_are_not_split(server, make_client):
+    client = make_client(download_parts=4)
+    execution_id = server.add_execution()
+    size = os.path.getsize(server.results_path(execution_id))
+
+    client.get_pipeline_results_dataframe(execution_id)
+
+    assert client.stats()['bytes']['download'] == size
+
+
+def test_learned_schema_parses_identically(server, make_client):
+    client = make_client(metadata_cache_size=0)
+    execution_id = server.add_execution(results_size=512 * 1024, code='x')
+
+    first = client.get_pipeline_results_dataframe(execution_id)
+    # parsed with the dtypes learned from the first load, which mustn't
+    # change the frame that is returned
+    second = client.get_pipeline_results_dataframe(execution_id)
+
+    assert client.stats()['cache']['schema']['hits'] == 1
+    assert_results_equal(first, read_expected(server, execution_id))
+    assert_results_equal(second, first)
+
+    # and neither must loading a date range, or iterating
+    window = client.get_pipeline_results_dataframe(
+        execution_id,
+        start='2000-01-04',
+        end='2000-01-04',
+    )
+    assert_results_equal(window, first.loc['2000-01-04':'2000-01-04'])
+    assert_results_equal(
+        pd.concat(client.get_pipeline_results_iter(execution_id)),
+        first,
+    )
+
+
+def test_results_iter(server, make_client):
+    client = make_client()
+    execution_id = server.add_execution()
+
+    chunks = list(client.get_pipeline_results_iter(execution_id))
+
+    assert all(
+        len(chunk.index.get_level_values('date').unique()) == 1
+        for chunk in chunks
+    )
+    assert_results_equal(
+        pd.concat(chunks),
+        read_expected(server, execution_id),
+    )
+    assert client.stats()['bytes']['download'] == \
+        os.path.getsize(server.results_path(execution_id))
+
+
+def test_results_iter_empty(server, make_client):
+    client = make_client()
+    execution_id = server.add_execution(results_size=0)
+
+    assert list(client.get_pipeline_results_iter(execution_id)) == []
+
+    [chunk] = client.get_pipeline_results_iter(execution_id, chunksize=10)
+    assert len(chunk) == 0
+    assert list(chunk.index.names) == ['date', 'sid']
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_keyboard_interrupt_during_download(server, make_client, tmpdir,
+                                            monkeypatch, cached):
+    monkeypatch.setattr('tempfile.tempdir', str(tmpdir.mkdir('tmp')))
+    cache_dir = tmpdir.mkdir('cache')
+    client = make_client(cache_dir=str(cache_dir) if cached else None)
+    execution_id = server.add_execution()
+
+    def download_from_offset(url, results_file, offset):
+        results_file.write(b'date,sid')
+        raise KeyboardInterrupt
+
+    client._download_from_offset = download_from_offset
+    with pytest.raises(KeyboardInterrupt):
+        client.get_pipeline_results_dataframe(execution_id)
+
+    assert os.listdir(str(tmpdir.join('tmp'))) == []
+    if cached:
+        assert os.listdir(str(cache_dir.join('partial'))) == [
+            execution_id + '.csv.part',
+        ]
+
+
+@pytest.mark.parametrize('result_format', ['parquet', 'arrow'])
+def test_columnar_results(server, make_client, result_format):
+    pytest.importorskip('pyarrow')
+    client = make_client()
+    execution_id = server.add_execution()
+
+    result_df = client.get_pipeline_results_dataframe(
+        execution_id,
+        result_format=result_format,
+    )
+
+    assert_results_equal(result_df, read_expected(server, execution_id))
+    # the columnar file was downloaded, rather than the csv
+    assert client.stats()['bytes']['download'] == os.path.getsize(
+        server.results_path(execution_id, result_format),
+    )
+    assert client.stats()['bytes']['download'] != os.path.getsize(
+        server.results_path(execution_id, 'csv'),
+    )
+
+
+def test_results_in_submitted_format(server, make_client):
+    pytest.importorskip('pyarrow')
+    client = make_client()
+    execution_id = server.add_execution(result_format='parquet')
+
+    # the format is detected from the file that was served
+    result_df = client.get_pipeline_results_dataframe(execution_id)
+
+    assert_results_equal(
+        result_df,
+        read_expected(server, execution_id, 'csv'),
+    )
+    assert client.stats()['bytes']['download'] == \
+        os.path.getsize(server.results_path(execution_id))
+
+
+def test_gzipped_results(server, make_client, tmpdir):
+    client = make_client(cache_dir=str(tmpdir))
+    execution_id = server.add_execution(
+        results_size=256 * 1024,
+        compression='gzip',
+    )
+    expected = read_expected(server, execution_id)
+    gzipped_path = server.results_path(execution_id)
+    gzipped_size = os.path.getsize(gzipped_path)
+
+    result_df = client.get_pipeline_results_dataframe(execution_id)
+
+    assert_results_equal(result_df, expected)
+    # the compressed file was downloaded as it was stored
+    assert client.stats()['bytes']['download'] == gzipped_size
+    assert gzipped_size < os.path.getsize(os.path.splitext(gzipped_path)[0])
+
+    assert_results_equal(
+        pd.concat(client.get_pipeline_results_iter(execution_id)),
+        expected,
+    )
@@ -0,0 +1,225 @@
+import pytest
+
+from aqueduct_client import FIRST_COMPLETED
+from aqueduct_client.errors import PipelineExecutionTimeout
+from aqueduct_client.testing import FakeAqueductServer
+
+
+def job(start_date='2000-01-03', end_date='2000-01-31', **kwargs):
+    return dict(
+        code='code',
+        start_date=start_date,
+        end_date=end_date,
+        **kwargs
+    )
+
+
+def test_submit_many_within_quota(make_client):
+    with FakeAqueductServer(maximum=2, run_time=0.1) as server:
+        client = make_client(server)
+
+        execution_ids = client.submit_many(
+            [job(name=str(i)) for i in range(5)],
+            poll_interval=0.01,
+            max_interval=0.05,
+        )
+
+        assert len(set(execution_ids)) == 5
+        names = {
+            execution['id']: execution['name']
+            for execution in server.executions()
+        }
+        assert [names[execution_id] for execution_id in execution_ids] == \
+            [str(i) for i in range(5)]
+        # the quota filled up, so we waited for slots to free up
+        assert client.stats()['phases']['quota']['count'] > 1
+
+
+def test_submit_many_when_another_client_takes_a_slot(make_client):
+    with FakeAqueductServer(maximum=1, run_time=0.1) as server:
+        client = make_client(server)
+        other = make_client(server)
+
+        # the quota looks free to `client` until it submits
+        quota = client.get_pipeline_execution_quota
+        client.get_pipeline_execution_quota = lambda: dict(
+            quota(),
+            running=0,
+        )
+        other.submit_pipeline_execution(**job())
+
+        execution_ids = client.submit_many(
+            [job()],
+            poll_interval=0.01,
+            max_interval=0.05,
+        )
+
+        assert len(execution_ids) == 1
+        assert len(server.executions()) == 2
+
+
+def test_submit_many_validates_jobs_first(server, make_client):
+    client = make_client()
+
+    with pytest.raises(ValueError):
+        client.submit_many([
+            job(),
+            job(start_date='2000-02-01', end_date='2000-01-01'),
+        ])
+
+    assert server.executions() == []
+
+
+def test_submit_many_reports_submitted_ids(server, make_client):
+    client = make_client()
+    submit = client.submit_pipeline_execution
+
+    def submit_once(**kwargs):
+        if server.executions():
+            raise RuntimeError("connection lost")
+        return submit(**kwargs)
+
+    client.submit_pipeline_execution = submit_once
+    with pytest.raises(RuntimeError) as excinfo:
+        client.submit_many([job(), job()])
+
+    assert excinfo.value.submitted_execution_ids == [
+        execution['id'] for execution in server.executions()
+    ]
+
+
+def test_wait_for_executions(make_client):
+    with FakeAqueductServer(
+        run_time=lambda body: float(body['name']),
+    ) as server:
+        client = make_client(server)
+        execution_ids = [
+            client.submit_pipeline_execution(**job(name=name))
+            for name in ('0.3', '0.0', '0.15')
+        ]
+
+        finished = list(client.wait_for_executions(
+            execution_ids + execution_ids[:1],
+            poll_interval=0.01,
+            max_interval=0.02,
+        ))
+
+        assert [pipeline['id'] for pipeline in finished] == [
+            execution_ids[1],
+            execution_ids[2],
+            execution_ids[0],
+        ]
+        assert all(pipeline['status'] == 'SUCCESS' for pipeline in finished)
+
+
+def test_wait_for_finished_duplicates(server, make_client):
+    client = make_client()
+    execution_id = server.add_execution()
+    client.get_pipeline_execution(execution_id)
+
+    finished = list(client.wait_for_executions([execution_id] * 3))
+
+    assert [pipeline['id'] for pipeline in finished] == [execution_id]
+
+
+def test_wait_for_first_completed(make_client):
+    with FakeAqueductServer(
+        run_time=lambda body: float(body['name']),
+    ) as server:
+        client = make_client(server)
+        execution_ids = [
+            client.submit_pipeline_execution(**job(name=name))
+            for name in ('10', '0.05')
+        ]
+
+        finished = list(client.wait_for_executions(
+            execution_ids,
+            return_when=FIRST_COMPLETED,
+            poll_interval=0.01,
+        ))
+
+        assert [pipeline['id'] for pipeline in finished] == execution_ids[1:]
+
+
+def test_wait_for_executions_timeout(make_client):
+    with FakeAqueductServer(run_time=10) as server:
+        client = make_client(server)
+        execution_id = client.submit_pipeline_execution(**job())
+
+        with pytest.raises(PipelineExecutionTimeout) as excinfo:
+            list(client.wait_for_executions(
+                [execution_id],
+                timeout=0.1,
+                poll_interval=0.01,
+            ))
+
+        assert excinfo.value.execution_ids == [execution_id]
+
+
+def test_wait_for_execution_fetches_results(make_client):
+    with FakeAqueductServer(run_time=0.05) as server:
+        client = make_client(server)
+        execution_id = client.submit_pipeline_execution(**job())
+
+        result_df = client.wait_for_execution(
+            execution_id,
+            poll_interval=0.01,
+            fetch_results=True,
+        )
+
+        assert list(result_df.index.names) == ['date', 'sid']
+
+
+def test_sharded_execution(make_client):
+    with FakeAqueductServer(maximum=2, run_time=0.05) as server:
+        client = make_client(server)
+
+        result_df = client.submit_sharded_pipeline_execution(
+            'code',
+            '2000-01-03',
+            '2000-12-15',
+            shard='Q',
+            name='alpha',
+            poll_interval=0.01,
+            max_interval=0.05,
+        )
+
+        shards = sorted(
+            (str(execution['start_date'])[:10],
+             str(execution['end_date'])[:10],
+             execution['name'])
+            for execution in server.executions()
+        )
+        assert shards == [
+            ('2000-01-03', '2000-03-31', 'alpha [2000-01-03 - 2000-03-31]'),
+            ('2000-04-01', '2000-06-30', 'alpha [2000-04-01 - 2000-06-30]'),
+            ('2000-07-01', '2000-09-30', 'alpha [2000-07-01 - 2000-09-30]'),
+            ('2000-10-01', '2000-12-15', 'alpha [2000-10-01 - 2000-12-15]'),
+        ]
+        # the quota filled up, so the later shards waited for a slot
+        assert client.stats()['phases']['quota']['count'] > 1
+
+        # the fake serves the same results for every shard, which overlap
+        # entirely, so only one copy of each row is kept
+        expected = client.get_pipeline_results_dataframe(
+            server.executions()[0]['id'],
+        )
+        assert not result_df.index.duplicated().any()
+        assert result_df.index.get_level_values('date').is_monotonic_increasing
+        assert result_df.sort_index().equals(expected.sort_index())
+
+
+def test_sharded_execution_error(make_client):
+    with FakeAqueductServer(error_rate=1.0) as server:
+        client = make_client(server)
+
+        with pytest.raises(ValueError):
+            client.submit_sharded_pipeline_execution(
+                'code',
+                '2000-01-03',
+                '2001-06-30',
+                poll_interval=0.01,
+                max_interval=0.05,
+            )
+
+        assert len(server.executions()) == 2
@@ -0,0 +1,162 @@
+import os
+
+import pytest
+import requests
+
+from aqueduct_client.instrumentation import OpenTelemetryHooks, StatsDHooks
+from aqueduct_client.retry import RetryPolicy
+from aqueduct_client.testing import FakeAqueductServer
+
+
+class FakeStatsClient(object):
+    """
+    Records the calls of a StatsD client.
+    """
+    def __init__(self):
+        self.timings = []
+        self.counts = {}
+
+    def timing(self, name, milliseconds):
+        self.timings.append((name, milliseconds))
+
+    def incr(self, name, count):
+        self.counts[name] = self.counts.get(name, 0) + count
+
+
+class FakeInstrument(object):
+    def __init__(self, name, unit, description):
+        self.name = name
+        self.unit = unit
+        self.description = description
+        self.values = []
+
+    def add(self, value, attributes):
+        self.values.append((value, attributes))
+
+    record = add
+
+
+class FakeMeter(object):
+    """
+    Creates instruments that record what is reported to them.
+    """
+    def __init__(self):
+        self.instruments = {}
+
+    def create_histogram(self, name, unit="", description=""):
+        return self._create(name, unit, description)
+
+    def create_counter(self, name, unit="", description=""):
+        return self._create(name, unit, description)
+
+    def _create(self, name, unit, description):
+        instrument = FakeInstrument(name, unit, description)
+        self.instruments[name] = instrument
+        return instrument
+
+
+def test_statsd_hooks(server, make_client):
+    statsd = FakeStatsClient()
+    client = make_client(
+        hooks=[StatsDHooks(statsd, prefix='test')],
+    )
+    execution_id = server.add_execution()
+
+    client.get_pipeline_results_dataframe(execution_id)
+
+    names = [name for name, _ in statsd.timings]
+    assert {'test.status', 'test.results_url', 'test.download',
+            'test.parse'} <= set(names)
+    [download_ms] = [ms for name, ms in statsd.timings
+                     if name == 'test.download']
+    download_seconds = client.stats()['phases']['download']['total']
+    assert abs(download_ms - download_seconds * 1000.0) < 1e-6
+
+    assert statsd.counts['test.download.bytes'] == \
+        os.path.getsize(server.results_path(execution_id))
+    assert statsd.counts['test.results_url.bytes'] > 0
+    assert 'schema' in client.stats()['cache']
+    for cache, lookups in client.stats()['cache'].items():
+        assert statsd.counts.get('test.cache.%s.hits' % cache, 0) == \
+            lookups['hits']
+        assert statsd.counts.get('test.cache.%s.misses' % cache, 0) == \
+            lookups['misses']
+
+
+def test_statsd_retries(make_client):
+    statsd = FakeStatsClient()
+    with FakeAqueductServer(failure_rate=0.5, seed=1) as server:
+        client = make_client(
+            server,
+            hooks=[StatsDHooks(statsd)],
+            retry_policy=RetryPolicy(
+                max_retries=10,
+                interval=0.01,
+                max_interval=0.05,
+            ),
+        )
+
+        for _ in range(10):
+            client.get_pipeline_execution_quota()
+
+    assert statsd.counts['aqueduct_client.quota.retries'] == \
+        client.stats()['retries']['quota']
+
+
+def test_opentelemetry_hooks(server, make_client):
+    meter = FakeMeter()
+    client = make_client(
+        hooks=[OpenTelemetryHooks(meter, prefix='test')],
+    )
+    execution_id = server.add_execution()
+
+    client.get_pipeline_results_dataframe(execution_id)
+
+    instruments = meter.instruments
+    assert sorted(instruments) == [
+        'test.bytes',
+        'test.cache.lookups',
+        'test.duration',
+        'test.retries',
+    ]
+    assert instruments['test.duration'].unit == 's'
+    assert instruments['test.bytes'].unit == 'By'
+
+    phases = {
+        attributes['phase']
+        for _, attributes in instruments['test.duration'].values
+    }
+    assert {'status', 'results_url', 'download', 'parse'} <= phases
+    assert all(
+        isinstance(seconds, float) and seconds >= 0
+        for seconds, _ in instruments['test.duration'].values
+    )
+
+    assert (
+        os.path.getsize(server.results_path(execution_id)),
+        {'phase': 'download'},
+    ) in instruments['test.bytes'].values
+    assert (1, {'cache': 'schema', 'hit': False}) in \
+        instruments['test.cache.lookups'].values
+    assert instruments['test.retries'].values == []
+
+
+def test_opentelemetry_retries(make_client):
+    meter = FakeMeter()
+    with FakeAqueductServer(failure_rate=1.0) as server:
+        client = make_client(
+            server,
+            hooks=[OpenTelemetryHooks(meter)],
+            retry_policy=RetryPolicy(
+                max_retries=2,
+                interval=0.01,
+                max_interval=0.01,
+            ),
+        )
+
+        with pytest.raises(requests.HTTPError):
+            client.get_pipeline_execution_quota()
+
+    assert meter.instruments['aqueduct_client.retries'].values == [
+        (1, {'phase': 'quota', 'reason': '503'}),
+    ] * 2
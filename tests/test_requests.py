@@ -0,0 +1,114 @@
+import time
+
+import pytest
+import requests
+
+from aqueduct_client.errors import (
+    ConcurrentExecutionsExceeded,
+    DeadlineExceeded,
+)
+from aqueduct_client.ratelimit import FileTokenBucket, TokenBucket
+from aqueduct_client.retry import RetryPolicy
+from aqueduct_client.testing import FakeAqueductServer
+
+
+def test_retries_on_503(make_client):
+    with FakeAqueductServer(failure_rate=0.5, seed=1) as server:
+        client = make_client(
+            server,
+            retry_policy=RetryPolicy(
+                max_retries=10,
+                interval=0.01,
+                max_interval=0.05,
+            ),
+            metadata_cache_size=0,
+        )
+        execution_id = server.add_execution()
+
+        for _ in range(10):
+            client.get_pipeline_execution(execution_id)
+
+        assert client.stats()['retries']['status'] > 0
+
+
+def test_no_retries(make_client):
+    with FakeAqueductServer(failure_rate=1.0) as server:
+        client = make_client(
+            server,
+            retry_policy=RetryPolicy(max_retries=0),
+        )
+
+        with pytest.raises(requests.HTTPError):
+            client.get_pipeline_execution_quota()
+
+        assert client.stats()['retries'] == {}
+
+
+def test_submissions_are_not_retried(make_client):
+    with FakeAqueductServer(maximum=0) as server:
+        client = make_client(server)
+
+        with pytest.raises(ConcurrentExecutionsExceeded):
+            client.submit_pipeline_execution(
+                'code',
+                '2000-01-03',
+                '2000-01-04',
+            )
+
+        assert client.stats()['retries'] == {}
+
+
+def test_deadline_exceeded(make_client):
+    with FakeAqueductServer(latency=1.0) as server:
+        client = make_client(server)
+
+        start = time.time()
+        with pytest.raises(DeadlineExceeded):
+            client.get_pipeline_execution_quota(deadline=0.2)
+
+        assert time.time() - start < 0.9
+
+
+def test_deadline_bounds_retries(make_client):
+    with FakeAqueductServer(failure_rate=1.0) as server:
+        client = make_client(
+            server,
+            retry_policy=RetryPolicy(
+                max_retries=100,
+                interval=0.1,
+                max_interval=0.1,
+            ),
+        )
+
+        start = time.time()
+        with pytest.raises((DeadlineExceeded, requests.HTTPError)):
+            client.get_pipeline_execution_quota(deadline=0.3)
+
+        assert time.time() - start < 0.9
+
+
+def test_deadline_bounds_rate_limit(server, make_client, tmpdir):
+    for rate_limiter in (
+        TokenBucket(rate=0.1),
+        FileTokenBucket(str(tmpdir.join('bucket')), rate=0.1),
+    ):
+        client = make_client(rate_limiter=rate_limiter)
+        client.get_pipeline_execution_quota()
+
+        start = time.time()
+        with pytest.raises(DeadlineExceeded):
+            client.get_pipeline_execution_quota(deadline=0.5)
+
+        assert time.time() - start < 0.4
+
+
+def test_rate_limit():
+    bucket = TokenBucket(rate=20, burst=2)
+
+    start = time.time()
+    for _ in range(6):
+        assert bucket.acquire()
+
+    # two tokens at once, then one every 50ms
+    assert 0.15 < time.time() - start < 0.5
+    assert not bucket.acquire(timeout=0.01)
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aqueduct_client.results import compact_results
+
+
+@pytest.fixture(params=[False, True], ids=['uncached', 'cached'])
+def client(request, make_client, tmpdir):
+    return make_client(cache_dir=str(tmpdir) if request.param else None)
+
+
+def test_columns_and_date_range(server, client):
+    # a few dates of results
+    execution_id = server.add_execution(results_size=512 * 1024)
+    full = client.get_pipeline_results_dataframe(execution_id)
+
+    result_df = client.get_pipeline_results_dataframe(
+        execution_id,
+        columns=['alpha', 'sector'],
+        start='2000-01-04',
+        end='2000-01-05',
+    )
+
+    expected = full.loc['2000-01-04':'2000-01-05', ['alpha', 'sector']]
+    pd.testing.assert_frame_equal(result_df, expected)
+
+
+def test_date_range_of_empty_results(server, client):
+    execution_id = server.add_execution(results_size=0)
+
+    full = client.get_pipeline_results_dataframe(execution_id)
+    result_df = client.get_pipeline_results_dataframe(
+        execution_id,
+        columns=['alpha'],
+        start='2000-01-04',
+        end='2000-01-05',
+    )
+
+    assert len(full) == 0
+    assert len(result_df) == 0
+    assert list(result_df.columns) == ['alpha']
+
+
+def test_compact(server, client):
+    execution_id = server.add_execution()
+    full = client.get_pipeline_results_dataframe(execution_id)
+
+    result_df = client.get_pipeline_results_dataframe(
+        execution_id,
+        compact=True,
+    )
+
+    assert result_df['alpha'].dtype == np.float32
+    assert result_df['beta'].dtype == np.float32
+    assert isinstance(result_df['sector'].dtype, pd.CategoricalDtype)
+    assert result_df['liquid'].dtype == full['liquid'].dtype
+    assert result_df.memory_usage().sum() < full.memory_usage().sum()
+
+    expected = full.astype({
+        'alpha': np.float32,
+        'beta': np.float32,
+        'sector': 'category',
+    })
+    pd.testing.assert_frame_equal(result_df, expected)
+
+
+def test_compact_keeps_floats_that_overflow_float32():
+    result_df = pd.DataFrame({
+        'small': [1.5, np.nan, -np.inf],
+        'large': [1.5, 1e300, np.nan],
+    })
+
+    compact_results(result_df)
+
+    assert result_df['small'].dtype == np.float32
+    assert result_df['large'].dtype == np.float64
+    assert result_df['large'][1] == 1e300
+
+
+@pytest.mark.parametrize(
+    'process_parse_threshold',
+    [None, 1],
+    ids=['threads', 'processes'],
+)
+def test_results_of_several_executions(server, client,
+                                       process_parse_threshold):
+    execution_ids = [
+        server.add_execution(results_size=size)
+        for size in (16 * 1024, 64 * 1024, 0)
+    ]
+    expected = [
+        client.get_pipeline_results_dataframe(execution_id)
+        for execution_id in execution_ids
+    ]
+
+    results = client.get_pipeline_results_dataframes(
+        execution_ids + execution_ids[:1],
+        parse_processes=2,
+        process_parse_threshold=process_parse_threshold,
+    )
+
+    # in the order asked for, without duplicates
+    assert list(results) == execution_ids
+    for execution_id, expected_df in zip(execution_ids, expected[:-1]):
+        pd.testing.assert_frame_equal(results[execution_id], expected_df)
+    assert len(results[execution_ids[-1]]) == 0
+    assert list(results[execution_ids[-1]].columns) == \
+        list(expected[-1].columns)
+
+    result_df = client.get_pipeline_results_dataframes(
+        execution_ids,
+        process_parse_threshold=process_parse_threshold,
+        concat=True,
+        columns=['alpha'],
+    )
+
+    # the empty results don't change the dtypes of the index
+    assert list(result_df.index.names) == ['execution_id', 'date', 'sid']
+    for execution_id, expected_df in zip(execution_ids, expected[:-1]):
+        pd.testing.assert_frame_equal(
+            result_df.loc[execution_id],
+            expected_df[['alpha']],
+        )
+    assert len(result_df) == sum(map(len, expected))